@@ -31,11 +31,16 @@ class Settings(BaseSettings):
     SHAP_CACHE_SIZE: int = int(os.getenv("SHAP_CACHE_SIZE", "1000"))
     CALIBRATION_METHOD: str = os.getenv("CALIBRATION_METHOD", "isotonic")
     PREDICTION_CONFIDENCE_THRESHOLD: float = 0.7
+    DETECTION_BATCH_MAX_SIZE: int = int(os.getenv("DETECTION_BATCH_MAX_SIZE", "32"))
+    DETECTION_BATCH_MAX_WAIT_MS: float = float(os.getenv("DETECTION_BATCH_MAX_WAIT_MS", "10"))
+    COMPILED_MODEL_MIN_BATCH: int = int(os.getenv("COMPILED_MODEL_MIN_BATCH", "16"))
     
     # Privacy Settings
     SESSION_TTL_MINUTES: int = int(os.getenv("SESSION_TTL_MINUTES", "30"))
     FILE_TTL_MINUTES: int = int(os.getenv("FILE_TTL_MINUTES", "5"))
     SHARE_LINK_MAX_DAYS: int = int(os.getenv("SHARE_LINK_MAX_DAYS", "7"))
+    SESSION_CACHE_SIZE: int = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+    SESSION_CACHE_TTL_SECONDS: float = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "5"))
     
     # External APIs
     GOOGLE_MAPS_API_KEY: str = os.getenv("GOOGLE_MAPS_API_KEY", "")
@@ -53,6 +58,9 @@ class Settings(BaseSettings):
     # Database Configuration (if needed for future extensions)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     
+    # Monitoring
+    METRICS_CACHE_TTL_SECONDS: float = float(os.getenv("METRICS_CACHE_TTL_SECONDS", "1"))
+    
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", "app.log")
@@ -60,6 +68,10 @@ class Settings(BaseSettings):
     # OCR Configuration
     TESSERACT_CMD: str = os.getenv("TESSERACT_CMD", "tesseract")
     OCR_LANGUAGES: List[str] = ["eng", "spa", "fra"]  # English, Spanish, French
+    OCR_CONCURRENCY: int = int(os.getenv("OCR_CONCURRENCY", str(os.cpu_count() or 2)))
+    OCR_DPI: int = int(os.getenv("OCR_DPI", "200"))
+    OCR_RETRY_DPI: int = int(os.getenv("OCR_RETRY_DPI", "300"))
+    OCR_RETRY_CONFIDENCE: float = float(os.getenv("OCR_RETRY_CONFIDENCE", "0.4"))
     
     # Medical Reference Ranges (for validation)
     MEDICAL_RANGES: dict = {
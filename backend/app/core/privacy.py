@@ -3,33 +3,208 @@ Privacy management for HIPAA-compliant health data handling.
 Session-based data management with automatic cleanup and anonymization.
 """
 
-import json
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Set
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import asyncio
 import uuid
 
+import orjson
 import redis.asyncio as redis
+import zstandard as zstd
+from cachetools import TTLCache
 
 from app.core.config import settings
+from app.core.exceptions import PrivacyException
 
 logger = logging.getLogger(__name__)
 
+# orjson serializes datetimes natively; naive values are treated as UTC and
+# timestamps are stored at second precision
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_OMIT_MICROSECONDS
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize a payload for Redis storage."""
+    return orjson.dumps(data, option=_ORJSON_OPTIONS)
+
+
+def _encode_fields(data: Dict[str, Any]) -> Dict[str, bytes]:
+    """Encode session fields individually for storage in a Redis hash."""
+    return {field: _dumps(value) for field, value in data.items()}
+
+
+def _decode_session(fields: List[bytes], file_ids: List[bytes]) -> Dict[str, Any]:
+    """Rebuild a session dict from flat HGETALL field/value pairs and file list."""
+    data = {
+        field.decode(): orjson.loads(value)
+        for field, value in zip(fields[::2], fields[1::2])
+    }
+    data["files_uploaded"] = [file_id.decode() for file_id in file_ids]
+    # Read time, in the same ISO format as the stored timestamps
+    data["last_accessed"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return data
+
+
+# Create a session hash only if the key is free (HSET has no NX form).
+# KEYS[1] = session key, ARGV[1] = TTL seconds, ARGV[2..] = field/value pairs
+_CREATE_SESSION_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Read a session and refresh its TTL in one server-side step.
+# KEYS[1] = session key, KEYS[2] = session files key, ARGV[1] = TTL seconds
+_GET_SESSION_SCRIPT = """
+local fields = redis.call('HGETALL', KEYS[1])
+if #fields == 0 then
+    return false
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return {fields, redis.call('LRANGE', KEYS[2], 0, -1)}
+"""
+
+# Write session fields and refresh TTLs only while the session exists, so an
+# expiry between check and write cannot recreate a hash without created_at.
+# An optional payload key (e.g. patient data) is written regardless.
+# KEYS[1] = session key, KEYS[2] = session files key, KEYS[3] = payload key,
+# ARGV[1] = TTL seconds, ARGV[2] = payload, ARGV[3..] = field/value pairs
+_UPDATE_SESSION_SCRIPT = """
+if KEYS[3] then
+    redis.call('SET', KEYS[3], ARGV[2], 'EX', ARGV[1])
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Store file metadata and, only while the session exists, append the file to
+# its list, so a dead session cannot leave an orphaned session_files list.
+# KEYS[1] = session key, KEYS[2] = session files key, KEYS[3] = file key,
+# ARGV[1] = session TTL seconds, ARGV[2] = file TTL seconds,
+# ARGV[3] = file id, ARGV[4] = metadata
+_ADD_SESSION_FILE_SCRIPT = """
+redis.call('SET', KEYS[3], ARGV[4], 'EX', ARGV[2])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Attempts at generating a free session id before giving up
+_SESSION_ID_ATTEMPTS = 3
+
+# Direct identifiers removed before storage
+_PATIENT_IDENTIFIERS = frozenset({
+    'email', 'phone', 'name', 'first_name', 'last_name',
+    'address', 'ssn', 'insurance_id', 'emergency_contact'
+})
+
+# Potentially identifying fields additionally removed for sharing
+_SHARE_EXTRA_IDENTIFIERS = frozenset({
+    'specific_medications', 'rare_conditions', 'unique_symptoms'
+})
+
+# Keys per SCAN page and per pipelined batch in the cleanup job
+_SCAN_BATCH_SIZE = 500
+
+# Age of a temp file without metadata before it is treated as orphaned
+_ORPHAN_GRACE_SECONDS = 60
+
+# Uploaded files are stored under their file id, a canonical UUID string;
+# anything else in the temp directory is not ours to reconcile
+_UPLOAD_NAME_PATTERN = re.compile(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+)
+
+# Upper age bounds (exclusive) for anonymized age groups
+_AGE_BUCKETS = (
+    (25, '18-24'),
+    (35, '25-34'),
+    (45, '35-44'),
+    (55, '45-54'),
+    (65, '55-64'),
+)
+
+# Age group for every whole age up to 127, indexed by age
+_AGE_LOOKUP = tuple(
+    next((label for upper, label in _AGE_BUCKETS if age < upper), '65+')
+    for age in range(128)
+)
+
 class PrivacyManager:
     """HIPAA-compliant privacy and session management."""
     
     def __init__(self, redis_client: redis.Redis = None):
         """Initialize privacy manager with optional Redis client."""
         self.redis = redis_client
+        # TTLs in whole seconds, passed straight to SETEX/EXPIRE
+        self._session_ttl_s = int(settings.SESSION_TTL_MINUTES * 60)
+        self._file_ttl_s = int(settings.FILE_TTL_MINUTES * 60)
+        # Patient data blobs are zstd-compressed; level 1 keeps encode cheap
+        self._zc = zstd.ZstdCompressor(level=1)
+        self._zd = zstd.ZstdDecompressor()
+        # Short-lived local copy of hot sessions as raw Redis replies; Redis
+        # stays the source of truth, so the TTL bounds staleness across workers.
+        # Hits skip the TTL refresh, so a session read only from the cache
+        # expires at most SESSION_CACHE_TTL_SECONDS earlier than otherwise.
+        self._session_cache = TTLCache(
+            maxsize=settings.SESSION_CACHE_SIZE,
+            ttl=settings.SESSION_CACHE_TTL_SECONDS
+        )
         self.temp_file_dir = Path(settings.TEMP_FILE_DIR)
         self.temp_file_dir.mkdir(parents=True, exist_ok=True)
+        # File deletes get their own threads so cleanup bursts do not
+        # starve the default executor used by request handlers
+        self._cleanup_pool = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 2),
+            thread_name_prefix="privacy-cleanup"
+        )
+        if self.redis:
+            self._check_raw_responses()
+            self._register_scripts()
         
+    @staticmethod
+    def _now() -> datetime:
+        """Current UTC time; formatted by orjson when the payload is stored."""
+        return datetime.now(timezone.utc)
+    
     async def initialize_redis(self):
         """Initialize Redis connection."""
         if not self.redis:
-            self.redis = redis.from_url(settings.REDIS_URL)
+            # Payloads are handed to orjson/zstd as raw bytes, so the client
+            # must not decode responses to str
+            self.redis = redis.from_url(settings.REDIS_URL, decode_responses=False)
+            self._register_scripts()
+    
+    def _check_raw_responses(self) -> None:
+        """Reject injected clients that decode responses to str."""
+        if self.redis.connection_pool.connection_kwargs.get("decode_responses"):
+            raise ValueError("PrivacyManager requires a Redis client with decode_responses=False")
+    
+    def _register_scripts(self) -> None:
+        """Register Lua scripts; redis-py runs them via EVALSHA."""
+        self._create_session_script = self.redis.register_script(_CREATE_SESSION_SCRIPT)
+        self._get_session_script = self.redis.register_script(_GET_SESSION_SCRIPT)
+        self._update_session_script = self.redis.register_script(_UPDATE_SESSION_SCRIPT)
+        self._add_session_file_script = self.redis.register_script(_ADD_SESSION_FILE_SCRIPT)
             
     async def cleanup_all_sessions(self):
         """Clean up all sessions - called during app shutdown."""
@@ -38,25 +213,39 @@ class PrivacyManager:
                 await self.redis.close()
             except Exception as e:
                 logger.error(f"Error closing Redis connection: {e}")
+        self._cleanup_pool.shutdown(wait=False)
         
+    def _run_file_io(self, func, *args) -> asyncio.Future:
+        """Run blocking temp-file I/O on the dedicated cleanup pool."""
+        return asyncio.get_running_loop().run_in_executor(self._cleanup_pool, func, *args)
+    
     async def create_session(self) -> str:
         """Create new privacy-protected session with TTL."""
-        session_id = str(uuid.uuid4())
+        now = self._now()
         session_data = {
-            "created_at": datetime.utcnow().isoformat(),
-            "last_accessed": datetime.utcnow().isoformat(),
+            "created_at": now,
+            "last_accessed": now,
             "data_processed": False,
-            "files_uploaded": [],
             "risk_assessments": [],
             "sharing_enabled": False
         }
+        fields = [
+            item for field_value in _encode_fields(session_data).items()
+            for item in field_value
+        ]
         
-        # Store in Redis with TTL
-        await self.redis.setex(
-            f"session:{session_id}",
-            timedelta(minutes=settings.SESSION_TTL_MINUTES),
-            json.dumps(session_data)
-        )
+        # Store as a hash with TTL; uploaded files live in session_files:{id}.
+        # The script refuses to overwrite an existing session on id collision.
+        for _ in range(_SESSION_ID_ATTEMPTS):
+            session_id = uuid.uuid4().hex
+            created = await self._create_session_script(
+                keys=[f"session:{session_id}"],
+                args=[self._session_ttl_s, *fields]
+            )
+            if created:
+                break
+        else:
+            raise PrivacyException("Unable to allocate a unique session id")
         
         logger.info(f"Created privacy session: {session_id}")
         return session_id
@@ -64,17 +253,21 @@ class PrivacyManager:
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session data if it exists and is valid."""
         try:
-            session_data = await self.redis.get(f"session:{session_id}")
+            # Decoding per call hands every caller its own lists and dicts
+            cached = self._session_cache.get(session_id)
+            if cached is not None:
+                return _decode_session(*cached)
+            
+            # Refresh TTL alongside the read; last_accessed is only persisted
+            # by update_session when the session actually changes
+            session_data = await self._get_session_script(
+                keys=[f"session:{session_id}", f"session_files:{session_id}"],
+                args=[self._session_ttl_s]
+            )
+            
             if session_data:
-                data = json.loads(session_data)
-                # Update last accessed time
-                data["last_accessed"] = datetime.utcnow().isoformat()
-                await self.redis.setex(
-                    f"session:{session_id}",
-                    timedelta(minutes=settings.SESSION_TTL_MINUTES),
-                    json.dumps(data)
-                )
-                return data
+                self._session_cache[session_id] = session_data
+                return _decode_session(*session_data)
             return None
         except Exception as e:
             logger.error(f"Session retrieval failed for {session_id}: {str(e)}")
@@ -83,26 +276,36 @@ class PrivacyManager:
     async def update_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
         """Update session data while maintaining privacy."""
         try:
-            session_data = await self.get_session(session_id)
-            if not session_data:
-                return False
-            
-            session_data.update(updates)
-            session_data["last_accessed"] = datetime.utcnow().isoformat()
-            
-            await self.redis.setex(
-                f"session:{session_id}",
-                timedelta(minutes=settings.SESSION_TTL_MINUTES),
-                json.dumps(session_data)
-            )
-            return True
+            return await self._write_session(session_id, updates)
         except Exception as e:
             logger.error(f"Session update failed for {session_id}: {str(e)}")
             return False
     
+    async def _write_session(self, session_id: str, updates: Dict[str, Any],
+                             payload_key: Optional[str] = None, payload: bytes = b"") -> bool:
+        """Write session fields and refresh TTLs in one round-trip if the session exists."""
+        self._session_cache.pop(session_id, None)
+        fields = [
+            item for field_value in _encode_fields({**updates, "last_accessed": self._now()}).items()
+            for item in field_value
+        ]
+        keys = [f"session:{session_id}", f"session_files:{session_id}"]
+        if payload_key is not None:
+            keys.append(payload_key)
+        return bool(await self._update_session_script(
+            keys=keys,
+            args=[self._session_ttl_s, payload, *fields]
+        ))
+    
     async def store_patient_data(self, session_id: str, patient_data: Dict[str, Any], 
-                               anonymize: bool = True) -> bool:
-        """Store patient data with privacy protection."""
+                               anonymize: bool = True,
+                               session_data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Store patient data with privacy protection.
+        
+        Callers that already hold the session from get_session can pass it as
+        session_data to have the new flags applied to it as well.
+        """
         try:
             if anonymize:
                 # Remove direct identifiers but keep medically relevant data
@@ -110,17 +313,17 @@ class PrivacyManager:
             else:
                 anonymized_data = patient_data
             
-            await self.redis.setex(
-                f"patient_data:{session_id}",
-                timedelta(minutes=settings.SESSION_TTL_MINUTES),
-                json.dumps(anonymized_data)
+            # Store data and session metadata in one round-trip
+            await self._write_session(
+                session_id,
+                {"data_processed": True, "data_anonymized": anonymize},
+                payload_key=f"patient_data:{session_id}",
+                payload=self._zc.compress(_dumps(anonymized_data))
             )
             
-            # Update session metadata
-            await self.update_session(session_id, {
-                "data_processed": True,
-                "data_anonymized": anonymize
-            })
+            if session_data is not None:
+                session_data["data_processed"] = True
+                session_data["data_anonymized"] = anonymize
             
             logger.info(f"Stored patient data for session: {session_id}")
             return True
@@ -133,7 +336,7 @@ class PrivacyManager:
         try:
             patient_data = await self.redis.get(f"patient_data:{session_id}")
             if patient_data:
-                return json.loads(patient_data)
+                return orjson.loads(self._zd.decompress(patient_data))
             return None
         except Exception as e:
             logger.error(f"Patient data retrieval failed for {session_id}: {str(e)}")
@@ -148,21 +351,21 @@ class PrivacyManager:
                 "file_id": file_id,
                 "file_type": metadata.get("file_type"),
                 "file_size": metadata.get("file_size"),
-                "upload_time": datetime.utcnow().isoformat(),
+                "upload_time": self._now(),
                 "processed": False
             }
             
-            await self.redis.setex(
-                f"file:{file_id}",
-                timedelta(minutes=settings.FILE_TTL_MINUTES),
-                json.dumps(safe_metadata)
-            )
+            self._session_cache.pop(session_id, None)
             
-            # Update session with file reference
-            session_data = await self.get_session(session_id)
-            if session_data:
-                session_data["files_uploaded"].append(file_id)
-                await self.update_session(session_id, session_data)
+            # Store metadata and append the file reference in one round-trip
+            await self._add_session_file_script(
+                keys=[
+                    f"session:{session_id}",
+                    f"session_files:{session_id}",
+                    f"file:{file_id}"
+                ],
+                args=[self._session_ttl_s, self._file_ttl_s, file_id, _dumps(safe_metadata)]
+            )
             
             logger.info(f"Stored file metadata: {file_id} for session: {session_id}")
             return True
@@ -175,7 +378,7 @@ class PrivacyManager:
         try:
             metadata = await self.redis.get(f"file:{file_id}")
             if metadata:
-                return json.loads(metadata)
+                return orjson.loads(metadata)
             return None
         except Exception as e:
             logger.error(f"File metadata retrieval failed for {file_id}: {str(e)}")
@@ -184,18 +387,36 @@ class PrivacyManager:
     async def cleanup_session(self, session_id: str) -> bool:
         """Comprehensive cleanup of session data and files."""
         try:
-            # Get session data to find associated files
-            session_data = await self.get_session(session_id)
+            self._session_cache.pop(session_id, None)
             
-            if session_data:
-                # Clean up associated files
-                for file_id in session_data.get("files_uploaded", []):
-                    await self._cleanup_file(file_id)
+            # Get associated files
+            file_ids = [
+                file_id.decode()
+                for file_id in await self.redis.lrange(f"session_files:{session_id}", 0, -1)
+            ]
             
-            # Delete session data
-            await self.redis.delete(f"session:{session_id}")
-            await self.redis.delete(f"patient_data:{session_id}")
-            await self.redis.delete(f"risk_results:{session_id}")
+            keys = [
+                f"session:{session_id}",
+                f"session_files:{session_id}",
+                f"patient_data:{session_id}",
+                f"risk_results:{session_id}",
+                *(f"file:{file_id}" for file_id in file_ids)
+            ]
+            
+            # Single UNLINK for all keys, physical files removed concurrently;
+            # a failed file delete is logged without aborting the cleanup
+            unlink_result, *file_results = await asyncio.gather(
+                self.redis.unlink(*keys),
+                *(self._run_file_io(self._delete_physical_file, file_id) for file_id in file_ids),
+                return_exceptions=True
+            )
+            
+            for file_id, result in zip(file_ids, file_results):
+                if isinstance(result, Exception):
+                    logger.error(f"File cleanup failed for {file_id}: {str(result)}")
+            
+            if isinstance(unlink_result, Exception):
+                raise unlink_result
             
             logger.info(f"Cleaned up session: {session_id}")
             return True
@@ -203,22 +424,14 @@ class PrivacyManager:
             logger.error(f"Session cleanup failed for {session_id}: {str(e)}")
             return False
     
-    async def _cleanup_file(self, file_id: str) -> bool:
-        """Clean up individual file and metadata."""
+    def _delete_physical_file(self, file_id: str) -> None:
+        """Delete an uploaded file from temporary storage if present."""
+        file_path = self.temp_file_dir / file_id
         try:
-            # Delete file metadata from Redis
-            await self.redis.delete(f"file:{file_id}")
-            
-            # Delete physical file if it exists
-            file_path = self.temp_file_dir / file_id
-            if file_path.exists():
-                file_path.unlink()
-                logger.info(f"Deleted physical file: {file_id}")
-            
-            return True
-        except Exception as e:
-            logger.error(f"File cleanup failed for {file_id}: {str(e)}")
-            return False
+            file_path.unlink()
+        except FileNotFoundError:
+            return
+        logger.info(f"Deleted physical file: {file_id}")
     
     async def schedule_cleanup(self, session_id: str, delay_minutes: int = None) -> None:
         """Schedule automatic cleanup of session data."""
@@ -232,13 +445,19 @@ class PrivacyManager:
     async def get_data_retention_info(self, session_id: str) -> Dict[str, Any]:
         """Get information about data retention and cleanup schedules."""
         try:
-            session_ttl = await self.redis.ttl(f"session:{session_id}")
+            # Absolute expiry from the server (-1 no expiry, -2 missing key)
+            expiry_ms = await self.redis.pexpiretime(f"session:{session_id}")
+            
+            if expiry_ms > 0:
+                expires_at = datetime.fromtimestamp(expiry_ms / 1000, tz=timezone.utc)
+                session_ttl = max(int(expiry_ms / 1000 - time.time()), 0)
+            else:
+                expires_at = None
+                session_ttl = expiry_ms
             
             retention_info = {
                 "session_ttl_seconds": session_ttl,
-                "session_expires_at": (
-                    datetime.utcnow() + timedelta(seconds=session_ttl)
-                ).isoformat() if session_ttl > 0 else None,
+                "session_expires_at": expires_at.isoformat() if expires_at else None,
                 "file_ttl_minutes": settings.FILE_TTL_MINUTES,
                 "automatic_cleanup": True,
                 "data_anonymized": True
@@ -249,40 +468,27 @@ class PrivacyManager:
             logger.error(f"Retention info retrieval failed: {str(e)}")
             return {}
     
-    def _anonymize_patient_data(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _anonymize_patient_data(self, patient_data: Dict[str, Any], *,
+                                extra_drop: frozenset = frozenset()) -> Dict[str, Any]:
         """Anonymize patient data while preserving medical relevance."""
-        anonymized = patient_data.copy()
+        drops = _PATIENT_IDENTIFIERS | extra_drop if extra_drop else _PATIENT_IDENTIFIERS
         
-        # Remove direct identifiers
-        identifiers_to_remove = [
-            'email', 'phone', 'name', 'first_name', 'last_name',
-            'address', 'ssn', 'insurance_id', 'emergency_contact'
-        ]
-        
-        for identifier in identifiers_to_remove:
-            anonymized.pop(identifier, None)
+        # Remove direct identifiers (and any extra fields) in a single pass
+        anonymized = {
+            key: value for key, value in patient_data.items()
+            if key not in drops
+        }
         
         # Generalize age to age groups
         if 'age' in anonymized:
-            age = anonymized['age']
-            if age < 25:
-                anonymized['age_group'] = '18-24'
-            elif age < 35:
-                anonymized['age_group'] = '25-34'
-            elif age < 45:
-                anonymized['age_group'] = '35-44'
-            elif age < 55:
-                anonymized['age_group'] = '45-54'
-            elif age < 65:
-                anonymized['age_group'] = '55-64'
-            else:
-                anonymized['age_group'] = '65+'
+            age = int(anonymized['age'])
+            anonymized['age_group'] = _AGE_LOOKUP[min(max(age, 0), 127)]
             
             # Keep original age for medical calculations but flag as anonymized
             anonymized['age_anonymized'] = True
         
         # Add anonymization timestamp
-        anonymized['anonymized_at'] = datetime.utcnow().isoformat()
+        anonymized['anonymized_at'] = self._now()
         
         return anonymized
     
@@ -290,7 +496,7 @@ class PrivacyManager:
                               include_personal_info: bool = False) -> Optional[str]:
         """Create shareable link for results with privacy controls."""
         try:
-            share_id = str(uuid.uuid4())
+            share_id = uuid.uuid4().hex
             
             # Get patient data and results
             patient_data = await self.get_patient_data(session_id)
@@ -307,10 +513,10 @@ class PrivacyManager:
             await self.redis.setex(
                 f"share:{share_id}",
                 timedelta(days=expiry_days),
-                json.dumps({
+                _dumps({
                     "original_session": session_id,
                     "data": share_data,
-                    "created_at": datetime.utcnow().isoformat(),
+                    "created_at": self._now(),
                     "include_personal_info": include_personal_info
                 })
             )
@@ -323,19 +529,14 @@ class PrivacyManager:
     
     def _anonymize_for_sharing(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """Additional anonymization specifically for sharing."""
-        share_data = self._anonymize_patient_data(patient_data.copy())
-        
         # Further remove potentially identifying information
-        additional_removals = [
-            'specific_medications', 'rare_conditions', 'unique_symptoms'
-        ]
-        
-        for field in additional_removals:
-            share_data.pop(field, None)
+        share_data = self._anonymize_patient_data(
+            patient_data, extra_drop=_SHARE_EXTRA_IDENTIFIERS
+        )
         
         # Mark as prepared for sharing
         share_data['prepared_for_sharing'] = True
-        share_data['sharing_timestamp'] = datetime.utcnow().isoformat()
+        share_data['sharing_timestamp'] = self._now()
         
         return share_data
     
@@ -343,21 +544,82 @@ class PrivacyManager:
         """Background job to clean up expired data."""
         try:
             # This would typically run as a scheduled job
-            # Clean up any temporary files older than the TTL
-            cutoff_time = datetime.utcnow() - timedelta(minutes=settings.FILE_TTL_MINUTES)
+            # Scan disk and Redis concurrently, then reconcile the two
+            disk_files, live_file_ids = await asyncio.gather(
+                self._run_file_io(self._scan_temp_files),
+                self._scan_file_metadata()
+            )
+            
+            # Remove files older than the TTL, plus uploads whose metadata has
+            # already expired (after a short grace for in-flight uploads)
+            now = time.time()
+            cutoff = now - self._file_ttl_s
+            orphan_cutoff = now - _ORPHAN_GRACE_SECONDS
+            expired = [
+                self.temp_file_dir / file_id
+                for file_id, modified in disk_files.items()
+                if modified < cutoff or (
+                    modified < orphan_cutoff
+                    and file_id not in live_file_ids
+                    and _UPLOAD_NAME_PATTERN.fullmatch(file_id)
+                )
+            ]
+            if not expired:
+                return
             
-            for file_path in self.temp_file_dir.iterdir():
-                if file_path.is_file():
-                    file_modified = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if file_modified < cutoff_time:
-                        try:
-                            file_path.unlink()
-                            logger.info(f"Cleaned up expired file: {file_path.name}")
-                        except Exception as e:
-                            logger.error(f"Failed to delete expired file {file_path.name}: {str(e)}")
+            # Delete files concurrently alongside a single UNLINK of their metadata
+            redis_result, *results = await asyncio.gather(
+                self.redis.unlink(*(f"file:{file_path.name}" for file_path in expired)),
+                *(self._run_file_io(partial(file_path.unlink, missing_ok=True)) for file_path in expired),
+                return_exceptions=True
+            )
+            
+            if isinstance(redis_result, Exception):
+                logger.error(f"Failed to delete expired file metadata: {str(redis_result)}")
+            
+            for file_path, result in zip(expired, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to delete expired file {file_path.name}: {str(result)}")
+                else:
+                    logger.info(f"Cleaned up expired file: {file_path.name}")
             
         except Exception as e:
             logger.error(f"Cleanup job failed: {str(e)}")
+    
+    def _scan_temp_files(self) -> Dict[str, float]:
+        """Map temporary file names to their modification timestamps."""
+        # scandir entries cache stat results, avoiding a second syscall per file
+        with os.scandir(self.temp_file_dir) as entries:
+            return {
+                entry.name: entry.stat().st_mtime
+                for entry in entries if entry.is_file()
+            }
+    
+    async def _scan_file_metadata(self) -> Set[str]:
+        """Collect file ids with live metadata, logging any without a TTL."""
+        file_ids = [
+            key.decode()[len("file:"):]
+            async for key in self.redis.scan_iter(match="file:*", count=_SCAN_BATCH_SIZE)
+        ]
+        
+        live_file_ids = set()
+        for start in range(0, len(file_ids), _SCAN_BATCH_SIZE):
+            batch = file_ids[start:start + _SCAN_BATCH_SIZE]
+            
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for file_id in batch:
+                    pipe.pexpiretime(f"file:{file_id}")
+                expiries = await pipe.execute()
+            
+            # -2: expired since the scan, -1: metadata that would never expire
+            for file_id, expiry_ms in zip(batch, expiries):
+                if expiry_ms == -2:
+                    continue
+                live_file_ids.add(file_id)
+                if expiry_ms == -1:
+                    logger.warning(f"File metadata without TTL: {file_id}")
+        
+        return live_file_ids
 
 
 # Global privacy manager instance
@@ -3,22 +3,31 @@ OCR engine for text extraction from images and image-based PDFs.
 Implements Tesseract OCR with preprocessing and confidence scoring.
 """
 
+import csv
+import hashlib
+import io
 import logging
+import multiprocessing
+import os
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import tempfile
+import threading
 import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 
 # Image processing imports
 try:
-    from PIL import Image, ImageEnhance, ImageFilter
+    from PIL import Image, ImageEnhance, ImageFilter, ImageStat
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
 try:
     import cv2
-    import numpy as np
     CV2_AVAILABLE = True
 except ImportError:
     CV2_AVAILABLE = False
@@ -29,10 +38,179 @@ try:
 except ImportError:
     TESSERACT_AVAILABLE = False
 
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Columns of Tesseract's word-level data used for confidence and text blocks
+OCR_DATA_FIELDS = ('text', 'conf', 'left', 'top', 'width', 'height', 'block_num')
+OCR_DATA_DTYPES = {
+    'text': np.str_,
+    'conf': np.float64,
+    'left': np.int32,
+    'top': np.int32,
+    'width': np.int32,
+    'height': np.int32,
+    'block_num': np.int32
+}
+
+# Characters Tesseract is allowed to recognize
+CHAR_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,;:!?()[]{}"-/ '
+
+# Tesseract command-line configuration arguments
+TESSERACT_ARGS = (
+    '--oem', '3',  # Use default OCR Engine Mode
+    '--psm', '6',  # Assume a single uniform block of text
+    '-c', f'tessedit_char_whitelist={CHAR_WHITELIST}'
+)
+
+# Resolution and timeout (seconds) for Tesseract subprocesses reading stdin
+TESSERACT_DPI = 300
+TESSERACT_TIMEOUT = 30
+
+# 3x3 sharpening kernel applied during preprocessing
+SHARPEN_KERNEL = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32)
+
+# Neighbourhood size and offset for adaptive thresholding
+ADAPTIVE_BLOCK_SIZE = 31
+ADAPTIVE_C = 10
+
+# Grayscale standard deviation below which a page is treated as blank
+BLANK_PAGE_STD = 5.0
+
+# Longest image side passed to Tesseract; about a letter page at 300 DPI
+MAX_OCR_DIMENSION = 2500
+
+# Number of preprocessed images kept in memory, keyed by content hash
+PREPROCESS_CACHE_SIZE = 64
+
+# Upper bound on low confidence regions reported per image
+MAX_LOW_CONFIDENCE_REGIONS = 100
+
+# Batches at least this large are handed to a single Tesseract process via an
+# image-list file, so the engine and language data are loaded only once
+NATIVE_BATCH_MIN_IMAGES = 50
+
+# test_ocr_availability results, keyed by Tesseract command
+_availability_cache: Dict[str, Dict[str, bool]] = {}
+
+# Preprocessed PNG bytes keyed by content hash, shared by every engine in the
+# process and bounded to PREPROCESS_CACHE_SIZE entries (least recently used out)
+_preprocess_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+def _init_preprocess_worker() -> None:
+    """Keep OpenCV single-threaded inside each preprocessing worker process."""
+    if CV2_AVAILABLE:
+        cv2.setNumThreads(1)
+
+def _init_ocr_thread() -> None:
+    """Keep libtesseract's OpenMP single-threaded on this OCR pool thread.
+    
+    OCR already runs one image per pool thread, so Tesseract spawning a thread
+    per core on top oversubscribes the CPU. The OpenMP thread count is
+    per-thread state, so other OpenMP users in the process are unaffected.
+    """
+    if THREADPOOLCTL_AVAILABLE:
+        threadpool_limits(limits=1, user_api='openmp')
+
+def _single_threaded_env() -> Dict[str, str]:
+    """Environment for Tesseract subprocesses with OpenMP limited to one thread.
+    
+    Several subprocesses run at once, so each one spawning a thread per core
+    oversubscribes the CPU.
+    """
+    return {**os.environ, 'OMP_THREAD_LIMIT': '1', 'OMP_NUM_THREADS': '1'}
+
+def _preprocess_image_sync(image_bytes: bytes) -> bytes:
+    """Decode encoded image bytes to grayscale and preprocess them for OCR.
+    
+    Module-level so it can be pickled into preprocessing worker processes.
+    Returns empty bytes for blank pages, which need no OCR.
+    """
+    if CV2_AVAILABLE:
+        image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is not None:
+            return _opencv_preprocessing(image)
+    
+    # Fall back to PIL for formats OpenCV cannot decode
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.mode != 'L':
+        image = image.convert('L')
+    if CV2_AVAILABLE:
+        return _opencv_preprocessing(np.ascontiguousarray(image))
+    
+    if ImageStat.Stat(image).stddev[0] < BLANK_PAGE_STD:
+        return b''
+    
+    if max(image.size) > MAX_OCR_DIMENSION:
+        image.thumbnail((MAX_OCR_DIMENSION, MAX_OCR_DIMENSION), Image.Resampling.BOX)
+    
+    # 1. Enhance contrast
+    image = ImageEnhance.Contrast(image).enhance(1.5)
+    
+    # 2. Enhance sharpness
+    image = ImageEnhance.Sharpness(image).enhance(2.0)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def _opencv_preprocessing(image: np.ndarray) -> bytes:
+    """Preprocess a grayscale image in place with OpenCV and encode it as PNG."""
+    # Skip near-uniform images such as empty scanned sheets
+    if cv2.meanStdDev(image)[1][0, 0] < BLANK_PAGE_STD:
+        return b''
+    
+    # Downscale oversized images (e.g. phone photos) to roughly 300 DPI
+    longest_side = max(image.shape[:2])
+    if longest_side > MAX_OCR_DIMENSION:
+        scale = MAX_OCR_DIMENSION / longest_side
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    # 1. Enhance contrast by stretching the 1st-99th percentile range
+    low, high = np.percentile(image, (1, 99))
+    if high > low:
+        scale = 255.0 / (high - low)
+        cv2.convertScaleAbs(image, dst=image, alpha=scale, beta=-low * scale)
+    
+    # 2. Enhance sharpness
+    cv2.filter2D(image, -1, SHARPEN_KERNEL, dst=image)
+    
+    # 3. Apply Gaussian blur to remove noise
+    cv2.GaussianBlur(image, (3, 3), 0, dst=image)
+    
+    # 4. Apply a local threshold so unevenly lit scans binarize cleanly
+    cv2.adaptiveThreshold(
+        image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+        ADAPTIVE_BLOCK_SIZE, ADAPTIVE_C, dst=image
+    )
+    
+    logger.info("Image preprocessing completed")
+    return cv2.imencode('.png', image)[1].tobytes()
+
+def _render_pdf_page(document: "pymupdf.Document", page_number: int, dpi: int) -> np.ndarray:
+    """Render a 1-based PDF page to a grayscale array with PyMuPDF."""
+    pixmap = document[page_number - 1].get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY, alpha=False)
+    return np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width)
+
 class OCREngine:
     """
     OCR engine for extracting text from images and scanned documents.
@@ -48,9 +226,29 @@ class OCREngine:
         """Initialize OCR engine."""
         self.supported_formats = ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']
         self.languages = getattr(settings, 'OCR_LANGUAGES', ['eng'])
+        self._lang_arg = '+'.join(self.languages)
+        self._preprocess_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_preprocess_worker
+        )
+        
+        # tesserocr runs libtesseract in-process and releases the GIL while
+        # recognizing, so OCR calls run on a thread pool with one API per thread
+        self._ocr_pool = None
+        self._thread_local = threading.local()
+        self._tesserocr_apis: List["tesserocr.PyTessBaseAPI"] = []
+        self._tesserocr_apis_lock = threading.Lock()
+        if TESSEROCR_AVAILABLE:
+            self._ocr_pool = ThreadPoolExecutor(
+                max_workers=settings.OCR_CONCURRENCY,
+                thread_name_prefix="ocr",
+                initializer=_init_ocr_thread
+            )
         
         # Set Tesseract command path if specified
         tesseract_cmd = getattr(settings, 'TESSERACT_CMD', None)
+        self.tesseract_cmd = tesseract_cmd or 'tesseract'
         if tesseract_cmd and TESSERACT_AVAILABLE:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
     
@@ -71,61 +269,10 @@ class OCREngine:
         try:
             logger.info(f"Performing OCR on image: {image_path.name}")
             
-            if not TESSERACT_AVAILABLE:
-                raise RuntimeError("Tesseract OCR not available")
-            
-            if not PIL_AVAILABLE:
-                raise RuntimeError("PIL not available for image processing")
-            
             if not image_path.exists():
                 raise FileNotFoundError(f"Image file not found: {image_path}")
             
-            # Load and preprocess image
-            if preprocess:
-                processed_image = await self._preprocess_image(image_path)
-            else:
-                processed_image = Image.open(image_path)
-            
-            # Configure Tesseract
-            custom_config = self._get_tesseract_config()
-            
-            # Extract text with detailed data
-            ocr_data = pytesseract.image_to_data(
-                processed_image,
-                lang='+'.join(self.languages),
-                config=custom_config,
-                output_type=pytesseract.Output.DICT
-            )
-            
-            # Extract plain text
-            extracted_text = pytesseract.image_to_string(
-                processed_image,
-                lang='+'.join(self.languages),
-                config=custom_config
-            )
-            
-            # Calculate confidence scores
-            confidence_data = self._calculate_confidence(ocr_data, confidence_threshold)
-            
-            # Process text blocks
-            text_blocks = self._process_text_blocks(ocr_data, confidence_threshold)
-            
-            result = {
-                "text": extracted_text.strip(),
-                "confidence": confidence_data["average_confidence"],
-                "high_confidence_text": confidence_data["high_confidence_text"],
-                "low_confidence_regions": confidence_data["low_confidence_regions"],
-                "text_blocks": text_blocks,
-                "word_count": len(extracted_text.split()),
-                "character_count": len(extracted_text),
-                "languages": self.languages,
-                "preprocessing_applied": preprocess,
-                "extraction_successful": len(extracted_text.strip()) > 0,
-                "method": "tesseract_ocr"
-            }
-            
-            logger.info(f"OCR completed: {len(extracted_text)} characters, confidence: {confidence_data['average_confidence']:.2f}")
-            return result
+            image_bytes = image_path.read_bytes()
             
         except Exception as e:
             logger.error(f"OCR extraction failed: {str(e)}", exc_info=True)
@@ -136,181 +283,367 @@ class OCREngine:
                 "extraction_successful": False,
                 "method": "tesseract_error"
             }
+        
+        return await self._extract_from_bytes(image_bytes, preprocess, confidence_threshold)
     
-    async def _preprocess_image(self, image_path: Path) -> Image.Image:
-        """Preprocess image for better OCR accuracy."""
+    async def extract_text_from_pil(self, image: "Image.Image",
+                                    preprocess: bool = True,
+                                    confidence_threshold: float = 0.5) -> Dict[str, Any]:
+        """Extract text from an in-memory PIL image using OCR."""
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return await self._extract_from_bytes(buffer.getvalue(), preprocess, confidence_threshold)
+    
+    async def extract_text_from_array(self, image: np.ndarray,
+                                      preprocess: bool = True,
+                                      confidence_threshold: float = 0.5) -> Dict[str, Any]:
+        """Extract text from an in-memory grayscale image array using OCR."""
+        if not CV2_AVAILABLE:
+            return await self.extract_text_from_pil(Image.fromarray(image), preprocess, confidence_threshold)
+        
+        # PGM is an uncompressed header plus pixels, so encoding is a plain copy
+        # and both OpenCV and Tesseract read it back directly
+        image_bytes = cv2.imencode('.pgm', image)[1].tobytes()
+        return await self._extract_from_bytes(image_bytes, preprocess, confidence_threshold)
+    
+    async def _extract_from_bytes(self, image_bytes: bytes,
+                                  preprocess: bool,
+                                  confidence_threshold: float) -> Dict[str, Any]:
+        """Run OCR on encoded image bytes; Tesseract reads them without temp files."""
         try:
-            # Load image
-            image = Image.open(image_path)
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Apply preprocessing steps
-            
-            # 1. Enhance contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(1.5)
-            
-            # 2. Enhance sharpness
-            enhancer = ImageEnhance.Sharpness(image)
-            image = enhancer.enhance(2.0)
+            if not (TESSEROCR_AVAILABLE or TESSERACT_AVAILABLE):
+                raise RuntimeError("Tesseract OCR not available")
             
-            # 3. Convert to grayscale for better OCR
-            image = image.convert('L')
+            if not (CV2_AVAILABLE or PIL_AVAILABLE):
+                raise RuntimeError("Neither OpenCV nor PIL available for image processing")
             
-            # 4. Apply additional processing with OpenCV if available
-            if CV2_AVAILABLE:
-                image = await self._opencv_preprocessing(image)
+            if preprocess:
+                image_bytes = await self._preprocess_image(image_bytes)
+                if not image_bytes:
+                    logger.info("Skipping OCR on blank page")
+                    return {
+                        "text": "",
+                        "confidence": 0.0,
+                        "extraction_successful": False,
+                        "method": "blank_page_skip"
+                    }
             
-            logger.info("Image preprocessing completed")
-            return image
+            if TESSEROCR_AVAILABLE:
+                loop = asyncio.get_running_loop()
+                extracted_text, ocr_data = await loop.run_in_executor(
+                    self._ocr_pool, self._run_tesserocr, image_bytes
+                )
+            else:
+                # Run word-level data and plain text extraction concurrently as
+                # separate Tesseract subprocesses; word data comes back as raw
+                # TSV and is parsed with the C csv reader
+                tsv, extracted_text = await asyncio.gather(
+                    self._run_tesseract(image_bytes, 'tsv'),
+                    self._run_tesseract(image_bytes)
+                )
+                pages = self._parse_tsv(tsv)
+                ocr_data = next(iter(pages.values()), {field: [] for field in OCR_DATA_FIELDS})
+            
+            result = self._build_result(extracted_text, ocr_data, confidence_threshold, preprocess)
+            
+            logger.info(f"OCR completed: {len(extracted_text)} characters, confidence: {result['confidence']:.2f}")
+            return result
             
         except Exception as e:
-            logger.error(f"Image preprocessing failed: {str(e)}")
-            # Return original image if preprocessing fails
-            return Image.open(image_path)
+            logger.error(f"OCR extraction failed: {str(e)}", exc_info=True)
+            return {
+                "text": "",
+                "confidence": 0.0,
+                "error": str(e),
+                "extraction_successful": False,
+                "method": "tesseract_error"
+            }
     
-    async def _opencv_preprocessing(self, pil_image: Image.Image) -> Image.Image:
-        """Advanced preprocessing using OpenCV."""
+    async def _run_tesseract(self, image_bytes: bytes, *configs: str) -> str:
+        """Run a single-threaded Tesseract subprocess on image bytes via stdin/stdout."""
+        process = await asyncio.create_subprocess_exec(
+            self.tesseract_cmd, 'stdin', 'stdout',
+            '--dpi', str(TESSERACT_DPI),
+            '-l', self._lang_arg,
+            *TESSERACT_ARGS,
+            *configs,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=_single_threaded_env()
+        )
         try:
-            # Convert PIL to OpenCV format
-            opencv_image = np.array(pil_image)
-            
-            # Apply Gaussian blur to remove noise
-            opencv_image = cv2.GaussianBlur(opencv_image, (1, 1), 0)
-            
-            # Apply threshold to get better contrast
-            _, opencv_image = cv2.threshold(
-                opencv_image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
+            stdout, stderr = await asyncio.wait_for(process.communicate(image_bytes), TESSERACT_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise RuntimeError(f"Tesseract timed out after {TESSERACT_TIMEOUT} seconds") from None
+        if process.returncode != 0:
+            raise RuntimeError(f"Tesseract exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+        return stdout.decode('utf-8')
+    
+    def _get_tesserocr_api(self) -> "tesserocr.PyTessBaseAPI":
+        """Get this thread's Tesseract API, loading the language data on first use."""
+        api = getattr(self._thread_local, 'api', None)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(
+                lang=self._lang_arg,
+                psm=tesserocr.PSM.SINGLE_BLOCK,
+                oem=tesserocr.OEM.DEFAULT
+            )
+            api.SetVariable('tessedit_char_whitelist', CHAR_WHITELIST)
+            self._thread_local.api = api
+            with self._tesserocr_apis_lock:
+                self._tesserocr_apis.append(api)
+        return api
+    
+    def _run_tesserocr(self, image_bytes: bytes) -> Tuple[str, Dict[str, List]]:
+        """Recognize an encoded image in-process and collect word-level data."""
+        api = self._get_tesserocr_api()
+        image = None
+        if CV2_AVAILABLE:
+            image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is not None:
+            # Hand the decoded grayscale pixels straight to libtesseract
+            height, width = image.shape
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        else:
+            api.SetImage(Image.open(io.BytesIO(image_bytes)))
+        extracted_text = api.GetUTF8Text()
+        
+        ocr_data = {field: [] for field in OCR_DATA_FIELDS}
+        iterator = api.GetIterator()
+        if iterator is None:
+            return extracted_text, ocr_data
+        
+        word_level = tesserocr.RIL.WORD
+        block_num = 0
+        for word in tesserocr.iterate_level(iterator, word_level):
+            if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                block_num += 1
+            bbox = word.BoundingBox(word_level)
+            if bbox is None:
+                continue
+            left, top, right, bottom = bbox
+            ocr_data['text'].append(word.GetUTF8Text(word_level) or '')
+            ocr_data['conf'].append(word.Confidence(word_level))
+            ocr_data['left'].append(left)
+            ocr_data['top'].append(top)
+            ocr_data['width'].append(right - left)
+            ocr_data['height'].append(bottom - top)
+            ocr_data['block_num'].append(block_num)
+        
+        return extracted_text, ocr_data
+    
+    def _build_result(self, extracted_text: str, ocr_data: Dict[str, List],
+                      confidence_threshold: float, preprocess: bool) -> Dict[str, Any]:
+        """Assemble the extraction result from Tesseract text and word-level data."""
+        # Calculate confidence scores
+        confidence_data = self._calculate_confidence(ocr_data, confidence_threshold)
+        
+        # Process text blocks
+        text_blocks = self._process_text_blocks(ocr_data, confidence_threshold)
+        
+        return {
+            "text": extracted_text.strip(),
+            "confidence": confidence_data["average_confidence"],
+            "high_confidence_text": confidence_data["high_confidence_text"],
+            "low_confidence_regions": confidence_data["low_confidence_regions"],
+            "low_confidence_count": confidence_data["low_confidence_count"],
+            "text_blocks": text_blocks,
+            "word_count": len(extracted_text.split()),
+            "character_count": len(extracted_text),
+            "languages": self.languages,
+            "preprocessing_applied": preprocess,
+            "extraction_successful": len(extracted_text.strip()) > 0,
+            "method": "tesseract_ocr"
+        }
+    
+    async def _preprocess_image(self, image_bytes: bytes) -> bytes:
+        """Preprocess encoded image bytes for better OCR accuracy and return them PNG-encoded."""
+        try:
+            # Identical content (retries, multi-pass OCR) reuses the earlier result
+            cache_key = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+            cached = _preprocess_cache.get(cache_key)
+            if cached is not None:
+                _preprocess_cache.move_to_end(cache_key)
+                return cached
+            
+            # Preprocessing is CPU-bound, so it runs in worker processes to
+            # keep the event loop free
+            loop = asyncio.get_running_loop()
+            processed = await loop.run_in_executor(
+                self._preprocess_pool, _preprocess_image_sync, image_bytes
             )
             
-            # Apply morphological operations to clean up
-            kernel = np.ones((1, 1), np.uint8)
-            opencv_image = cv2.morphologyEx(opencv_image, cv2.MORPH_CLOSE, kernel)
-            opencv_image = cv2.morphologyEx(opencv_image, cv2.MORPH_OPEN, kernel)
-            
-            # Convert back to PIL
-            return Image.fromarray(opencv_image)
+            _preprocess_cache[cache_key] = processed
+            if len(_preprocess_cache) > PREPROCESS_CACHE_SIZE:
+                _preprocess_cache.popitem(last=False)
+            return processed
             
         except Exception as e:
-            logger.error(f"OpenCV preprocessing failed: {str(e)}")
-            return pil_image
-    
-    def _get_tesseract_config(self) -> str:
-        """Get Tesseract configuration string."""
-        config_options = [
-            '--oem 3',  # Use default OCR Engine Mode
-            '--psm 6',  # Assume a single uniform block of text
-            '-c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,;:!?()[]{}"-/ '
-        ]
+            logger.error(f"Image preprocessing failed: {str(e)}")
+            # Return original image if preprocessing fails
+            return image_bytes
+    
+    def _parse_tsv(self, tsv: str) -> Dict[int, Dict[str, Any]]:
+        """Parse Tesseract TSV output into per-page word-level data as NumPy columns."""
+        reader = csv.reader(io.StringIO(tsv), delimiter='\t', quoting=csv.QUOTE_NONE)
+        header = next(reader, None)
+        if not header:
+            return {}
+        
+        # Rows without a word carry no text column
+        width = len(header)
+        rows = [row if len(row) >= width else row + [''] * (width - len(row)) for row in reader]
+        if not rows:
+            return {}
+        
+        columns = dict(zip(header, zip(*rows)))
+        page_nums = np.array(columns['page_num'], dtype=np.int32)
+        data = {
+            field: np.array(columns[field], dtype=OCR_DATA_DTYPES[field])
+            for field in OCR_DATA_FIELDS
+        }
         
-        return ' '.join(config_options)
+        pages = {}
+        for page in np.unique(page_nums).tolist():
+            mask = page_nums == page
+            pages[page] = {field: values[mask] for field, values in data.items()}
+        return pages
     
     def _calculate_confidence(self, ocr_data: Dict[str, List], 
-                            threshold: float) -> Dict[str, Any]:
-        """Calculate confidence metrics from OCR data."""
+                            threshold: float,
+                            max_regions: int = MAX_LOW_CONFIDENCE_REGIONS) -> Dict[str, Any]:
+        """
+        Calculate confidence metrics from OCR data.
+        
+        Only the max_regions least confident words are reported as low
+        confidence regions, lowest confidence first; low_confidence_count
+        still counts every low confidence word.
+        """
         try:
-            confidences = [int(conf) for conf in ocr_data['conf'] if int(conf) > 0]
+            conf = np.asarray(ocr_data['conf'], dtype=np.float64).astype(np.int32)
+            valid = conf > 0
             
-            if not confidences:
+            if not valid.any():
                 return {
                     "average_confidence": 0.0,
                     "high_confidence_text": "",
-                    "low_confidence_regions": []
+                    "low_confidence_regions": [],
+                    "low_confidence_count": 0
                 }
             
-            average_confidence = sum(confidences) / len(confidences) / 100.0
+            average_confidence = float(conf[valid].mean()) / 100.0
             
-            # Extract high confidence text
-            high_confidence_text = []
-            low_confidence_regions = []
+            # Split non-empty words into high and low confidence sets
+            scores = conf / 100.0
+            text = np.char.strip(np.asarray(ocr_data['text'], dtype=str))
+            nonempty = np.char.str_len(text) > 0
+            high = nonempty & (scores >= threshold)
+            low = nonempty & ~high
             
-            for i, conf in enumerate(ocr_data['conf']):
-                conf_score = int(conf) / 100.0
-                text = ocr_data['text'][i].strip()
-                
-                if text and conf_score >= threshold:
-                    high_confidence_text.append(text)
-                elif text and conf_score < threshold:
-                    low_confidence_regions.append({
-                        "text": text,
-                        "confidence": conf_score,
-                        "bbox": {
-                            "left": ocr_data['left'][i],
-                            "top": ocr_data['top'][i],
-                            "width": ocr_data['width'][i],
-                            "height": ocr_data['height'][i]
-                        }
-                    })
+            # Keep only the worst regions so dense pages stay bounded
+            low_indices = np.flatnonzero(low)
+            low_indices = low_indices[np.argsort(scores[low_indices], kind='stable')[:max_regions]]
+            
+            low_confidence_regions = [
+                {
+                    "text": region_text,
+                    "confidence": confidence,
+                    "bbox": {"left": left, "top": top, "width": width, "height": height}
+                }
+                for region_text, confidence, left, top, width, height in zip(
+                    text[low_indices].tolist(),
+                    scores[low_indices].tolist(),
+                    np.asarray(ocr_data['left'])[low_indices].tolist(),
+                    np.asarray(ocr_data['top'])[low_indices].tolist(),
+                    np.asarray(ocr_data['width'])[low_indices].tolist(),
+                    np.asarray(ocr_data['height'])[low_indices].tolist()
+                )
+            ]
             
             return {
                 "average_confidence": average_confidence,
-                "high_confidence_text": " ".join(high_confidence_text),
-                "low_confidence_regions": low_confidence_regions
+                "high_confidence_text": " ".join(text[high].tolist()),
+                "low_confidence_regions": low_confidence_regions,
+                "low_confidence_count": int(np.count_nonzero(low))
             }
             
         except Exception as e:
             logger.error(f"Confidence calculation failed: {str(e)}")
-            return {"average_confidence": 0.0, "high_confidence_text": "", "low_confidence_regions": []}
+            return {
+                "average_confidence": 0.0,
+                "high_confidence_text": "",
+                "low_confidence_regions": [],
+                "low_confidence_count": 0
+            }
     
     def _process_text_blocks(self, ocr_data: Dict[str, List], 
-                           confidence_threshold: float) -> List[Dict[str, Any]]:
-        """Process OCR data into structured text blocks."""
+                           confidence_threshold: float,
+                           max_blocks: Optional[int] = None,
+                           sort_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Process OCR data into structured text blocks.
+        
+        Blocks are returned in reading order, or lowest average confidence
+        first when sort_by is "confidence"; max_blocks caps how many are built.
+        """
         try:
-            text_blocks = []
-            
-            # Group text by blocks
-            current_block = None
+            # Keep only non-empty words
+            text = np.char.strip(np.asarray(ocr_data['text'], dtype=str))
+            keep = np.flatnonzero(np.char.str_len(text) > 0)
+            if keep.size == 0:
+                return []
+            
+            words = text[keep]
+            conf = np.asarray(ocr_data['conf'], dtype=np.float64)[keep].astype(np.int32) / 100.0
+            block_nums = np.asarray(ocr_data['block_num'])[keep]
+            left = np.asarray(ocr_data['left'])[keep]
+            top = np.asarray(ocr_data['top'])[keep]
+            right = left + np.asarray(ocr_data['width'])[keep]
+            bottom = top + np.asarray(ocr_data['height'])[keep]
+            
+            # A new block starts wherever the block number changes
+            starts = np.flatnonzero(np.r_[True, block_nums[1:] != block_nums[:-1]])
+            ends = np.r_[starts[1:], keep.size]
+            
+            # Per-block bounding boxes and confidence averages
+            bbox_left = np.minimum.reduceat(left, starts).tolist()
+            bbox_top = np.minimum.reduceat(top, starts).tolist()
+            bbox_right = np.maximum.reduceat(right, starts).tolist()
+            bbox_bottom = np.maximum.reduceat(bottom, starts).tolist()
+            average_confidence = np.add.reduceat(conf, starts) / (ends - starts)
+            
+            order = np.arange(starts.size)
+            if sort_by == "confidence":
+                order = np.argsort(average_confidence, kind='stable')
+            if max_blocks is not None:
+                order = order[:max_blocks]
+            
+            starts = starts.tolist()
+            ends = ends.tolist()
+            average_confidence = average_confidence.tolist()
             
-            for i in range(len(ocr_data['text'])):
-                text = ocr_data['text'][i].strip()
-                if not text:
-                    continue
-                
-                conf = int(ocr_data['conf'][i]) / 100.0
-                block_num = ocr_data['block_num'][i]
-                
-                # Start new block if block number changes
-                if current_block is None or current_block['block_num'] != block_num:
-                    if current_block is not None:
-                        text_blocks.append(current_block)
-                    
-                    current_block = {
-                        "block_num": block_num,
-                        "text": [],
-                        "bbox": {
-                            "left": ocr_data['left'][i],
-                            "top": ocr_data['top'][i],
-                            "right": ocr_data['left'][i] + ocr_data['width'][i],
-                            "bottom": ocr_data['top'][i] + ocr_data['height'][i]
-                        },
-                        "confidence": [],
-                        "high_confidence": conf >= confidence_threshold
-                    }
-                
-                # Add text to current block
-                current_block['text'].append(text)
-                current_block['confidence'].append(conf)
-                
-                # Expand bounding box
-                current_block['bbox']['left'] = min(current_block['bbox']['left'], ocr_data['left'][i])
-                current_block['bbox']['top'] = min(current_block['bbox']['top'], ocr_data['top'][i])
-                current_block['bbox']['right'] = max(current_block['bbox']['right'], 
-                                                   ocr_data['left'][i] + ocr_data['width'][i])
-                current_block['bbox']['bottom'] = max(current_block['bbox']['bottom'], 
-                                                    ocr_data['top'][i] + ocr_data['height'][i])
-            
-            # Add final block
-            if current_block is not None:
-                text_blocks.append(current_block)
-            
-            # Post-process blocks
-            for block in text_blocks:
-                block['full_text'] = ' '.join(block['text'])
-                block['average_confidence'] = sum(block['confidence']) / len(block['confidence'])
-                block['word_count'] = len(block['text'])
+            text_blocks = []
+            for k in order.tolist():
+                start, end = starts[k], ends[k]
+                block_text = words[start:end].tolist()
+                text_blocks.append({
+                    "block_num": block_nums[start].item(),
+                    "text": block_text,
+                    "bbox": {
+                        "left": bbox_left[k],
+                        "top": bbox_top[k],
+                        "right": bbox_right[k],
+                        "bottom": bbox_bottom[k]
+                    },
+                    "confidence": conf[start:end].tolist(),
+                    "high_confidence": bool(conf[start] >= confidence_threshold),
+                    "full_text": ' '.join(block_text),
+                    "average_confidence": average_confidence[k],
+                    "word_count": end - start
+                })
             
             return text_blocks
             
@@ -323,45 +656,15 @@ class OCREngine:
         try:
             logger.info(f"Performing OCR on PDF page {page_number}: {pdf_path.name}")
             
-            if not PIL_AVAILABLE:
-                raise RuntimeError("PIL not available for PDF to image conversion")
+            if not PYMUPDF_AVAILABLE:
+                raise RuntimeError("PyMuPDF not available for PDF to image conversion")
             
-            # Convert PDF page to image
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Use pdf2image if available, otherwise skip
-                try:
-                    from pdf2image import convert_from_path
-                    
-                    pages = convert_from_path(
-                        pdf_path, 
-                        first_page=page_number,
-                        last_page=page_number,
-                        dpi=300  # High DPI for better OCR
-                    )
-                    
-                    if not pages:
-                        raise ValueError(f"Could not convert PDF page {page_number} to image")
-                    
-                    # Save page as temporary image
-                    temp_image_path = Path(temp_dir) / f"page_{page_number}.png"
-                    pages[0].save(temp_image_path, 'PNG')
-                    
-                    # Perform OCR on the image
-                    result = await self.extract_text(temp_image_path)
-                    result["source_page"] = page_number
-                    result["source_pdf"] = str(pdf_path)
-                    
-                    return result
-                    
-                except ImportError:
-                    logger.error("pdf2image not available for PDF to image conversion")
-                    return {
-                        "text": "",
-                        "confidence": 0.0,
-                        "error": "pdf2image not available",
-                        "extraction_successful": False
-                    }
-                    
+            document = await asyncio.to_thread(pymupdf.open, pdf_path)
+            try:
+                return await self._ocr_pdf_page(document, pdf_path, page_number)
+            finally:
+                document.close()
+                
         except Exception as e:
             logger.error(f"PDF page OCR failed: {str(e)}")
             return {
@@ -371,13 +674,78 @@ class OCREngine:
                 "extraction_successful": False
             }
     
+    async def extract_from_pdf_pages(self, pdf_path: Path,
+                                     page_numbers: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Extract text from several PDF pages using OCR, parsing the document once."""
+        try:
+            if not PYMUPDF_AVAILABLE:
+                raise RuntimeError("PyMuPDF not available for PDF to image conversion")
+            
+            document = await asyncio.to_thread(pymupdf.open, pdf_path)
+        except Exception as e:
+            logger.error(f"PDF OCR failed: {str(e)}")
+            return [{"error": str(e), "extraction_successful": False}]
+        
+        try:
+            if page_numbers is None:
+                page_numbers = list(range(1, document.page_count + 1))
+            logger.info(f"Performing OCR on {len(page_numbers)} PDF pages: {pdf_path.name}")
+            
+            results = []
+            for page_number in page_numbers:
+                try:
+                    results.append(await self._ocr_pdf_page(document, pdf_path, page_number))
+                except Exception as e:
+                    logger.error(f"PDF page OCR failed for page {page_number}: {str(e)}")
+                    results.append({
+                        "text": "",
+                        "confidence": 0.0,
+                        "error": str(e),
+                        "extraction_successful": False,
+                        "source_page": page_number,
+                        "source_pdf": str(pdf_path)
+                    })
+            return results
+        finally:
+            document.close()
+    
+    async def _ocr_pdf_page(self, document: "pymupdf.Document", pdf_path: Path,
+                            page_number: int) -> Dict[str, Any]:
+        """Render one page of an open PDF in memory and OCR it."""
+        # Render at the default resolution first; pages that come back with
+        # low confidence get one retry at a higher DPI
+        for dpi in (settings.OCR_DPI, settings.OCR_RETRY_DPI):
+            image = await asyncio.to_thread(_render_pdf_page, document, page_number, dpi)
+            result = await self.extract_text_from_array(image)
+            
+            # Only completed OCR passes with low confidence are worth re-rendering;
+            # blank pages and engine errors would come back the same
+            if (result.get("method") != "tesseract_ocr"
+                    or result.get("confidence", 0.0) >= settings.OCR_RETRY_CONFIDENCE
+                    or dpi >= settings.OCR_RETRY_DPI):
+                break
+            logger.info(f"Low OCR confidence on page {page_number} at {dpi} DPI, "
+                        f"retrying at {settings.OCR_RETRY_DPI} DPI")
+        
+        result["source_page"] = page_number
+        result["source_pdf"] = str(pdf_path)
+        return result
+    
     async def batch_extract(self, image_paths: List[Path]) -> List[Dict[str, Any]]:
         """Extract text from multiple images in parallel."""
         try:
             logger.info(f"Starting batch OCR for {len(image_paths)} images")
             
-            # Limit concurrent OCR operations
-            semaphore = asyncio.Semaphore(2)  # Max 2 concurrent OCR operations
+            # In-process tesserocr already keeps the engine loaded between images
+            if not TESSEROCR_AVAILABLE and len(image_paths) >= NATIVE_BATCH_MIN_IMAGES:
+                try:
+                    return await self._batch_extract_native(image_paths)
+                except Exception as e:
+                    logger.warning(f"Native batch OCR failed, falling back to per-image OCR: {str(e)}")
+            
+            # Limit concurrent OCR operations; each one runs on an OCR pool
+            # thread or in single-threaded Tesseract subprocesses
+            semaphore = asyncio.Semaphore(settings.OCR_CONCURRENCY)
             
             async def extract_single_image(image_path: Path) -> Dict[str, Any]:
                 async with semaphore:
@@ -411,6 +779,82 @@ class OCREngine:
             logger.error(f"Batch OCR failed: {str(e)}")
             return [{"error": str(e), "extraction_successful": False}]
     
+    async def _batch_extract_native(self, image_paths: List[Path]) -> List[Dict[str, Any]]:
+        """Extract text from many images with a single Tesseract process."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_dir = Path(temp_dir)
+            
+            # Preprocess every image upfront and write them where Tesseract can read them
+            processed_images = await asyncio.gather(
+                *(self._preprocess_image(image_path.read_bytes()) for image_path in image_paths)
+            )
+            # Blank pages are left out of the list and reported as skipped
+            listed_indices = [i for i, processed_image in enumerate(processed_images) if processed_image]
+            page_texts: List[str] = []
+            page_data: Dict[int, Dict[str, List]] = {}
+            
+            if listed_indices:
+                listed_paths = []
+                for i in listed_indices:
+                    processed_path = temp_dir / f"image_{i}.png"
+                    processed_path.write_bytes(processed_images[i])
+                    listed_paths.append(str(processed_path))
+                
+                list_file = temp_dir / "images.txt"
+                list_file.write_text("\n".join(listed_paths) + "\n")
+                
+                # One invocation over the list writes both plain text and TSV outputs
+                output_base = temp_dir / "output"
+                process = await asyncio.create_subprocess_exec(
+                    self.tesseract_cmd, str(list_file), str(output_base),
+                    '-l', self._lang_arg,
+                    *TESSERACT_ARGS,
+                    'txt', 'tsv',
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=_single_threaded_env()
+                )
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    raise RuntimeError(f"Tesseract exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+                
+                # Pages are separated by form feeds in the text output
+                page_texts = output_base.with_suffix('.txt').read_text(encoding='utf-8').split('\f')
+                page_data = self._parse_tsv(output_base.with_suffix('.tsv').read_text(encoding='utf-8'))
+        
+        page_numbers = {image_index: page for page, image_index in enumerate(listed_indices)}
+        results = []
+        for i, image_path in enumerate(image_paths):
+            page = page_numbers.get(i)
+            if page is None:
+                result = {
+                    "text": "",
+                    "confidence": 0.0,
+                    "extraction_successful": False,
+                    "method": "blank_page_skip"
+                }
+            else:
+                extracted_text = page_texts[page] if page < len(page_texts) else ""
+                ocr_data = page_data.get(page + 1, {field: [] for field in OCR_DATA_FIELDS})
+                result = self._build_result(extracted_text, ocr_data, 0.5, True)
+            result["file_path"] = str(image_path)
+            results.append(result)
+        
+        logger.info(f"Native batch OCR completed: {len(results)} images processed")
+        return results
+    
+    def close(self) -> None:
+        """Shut down the worker pools and release the loaded Tesseract engines."""
+        self._preprocess_pool.shutdown(wait=True, cancel_futures=True)
+        
+        # Wait for in-flight recognitions before freeing the APIs they use
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown(wait=True, cancel_futures=True)
+        with self._tesserocr_apis_lock:
+            for api in self._tesserocr_apis:
+                api.End()
+            self._tesserocr_apis.clear()
+    
     def is_supported_format(self, file_path: Path) -> bool:
         """Check if file format is supported for OCR."""
         return file_path.suffix.lower() in self.supported_formats
@@ -420,7 +864,15 @@ class OCREngine:
         return self.supported_formats.copy()
     
     async def test_ocr_availability(self) -> Dict[str, bool]:
-        """Test availability of OCR dependencies."""
+        """Test availability of OCR dependencies.
+        
+        The result only depends on the deployment, so it is computed once per
+        Tesseract command and reused by later calls such as health checks.
+        """
+        cached = _availability_cache.get(self.tesseract_cmd)
+        if cached is not None:
+            return dict(cached)
+        
         availability = {
             "tesseract": TESSERACT_AVAILABLE,
             "pil": PIL_AVAILABLE,
@@ -432,7 +884,7 @@ class OCREngine:
             try:
                 # Create simple test image
                 test_image = Image.new('RGB', (100, 30), color='white')
-                test_text = pytesseract.image_to_string(test_image)
+                await asyncio.to_thread(pytesseract.image_to_string, test_image)
                 availability["tesseract_functional"] = True
             except Exception as e:
                 logger.error(f"Tesseract functionality test failed: {str(e)}")
@@ -440,7 +892,8 @@ class OCREngine:
         else:
             availability["tesseract_functional"] = False
         
-        return availability
+        _availability_cache[self.tesseract_cmd] = availability
+        return dict(availability)
     
     def get_ocr_languages(self) -> List[str]:
         """Get list of available OCR languages."""
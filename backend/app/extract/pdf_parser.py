@@ -3,55 +3,127 @@ PDF parsing module for medical document extraction.
 Implements multi-stage PDF processing with table and text extraction.
 """
 
+import functools
+import importlib.util
 import logging
+import multiprocessing
+import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 import tempfile
 import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # PDF processing imports with error handling
 try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    PDFPLUMBER_AVAILABLE = False
-    
-try:
-    import camelot
-    CAMELOT_AVAILABLE = True
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
 except ImportError:
-    CAMELOT_AVAILABLE = False
+    PYMUPDF_AVAILABLE = False
+
+# pdfplumber and Camelot (pandas, OpenCV, Ghostscript) are slow to import, so
+# they are only located here and imported on first use
+PDFPLUMBER_AVAILABLE = importlib.util.find_spec("pdfplumber") is not None
+CAMELOT_AVAILABLE = importlib.util.find_spec("camelot") is not None
 
 import PyPDF2
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1)
+def _pdfplumber():
+    """Import pdfplumber on first use."""
+    import pdfplumber
+    return pdfplumber
+
+@functools.lru_cache(maxsize=1)
+def _camelot():
+    """Import Camelot on first use."""
+    import camelot
+    return camelot
+
+# Per-page text extraction fans out to at most this many threads, each
+# handling at least MIN_PAGES_PER_WORKER pages
+MAX_PAGE_WORKERS = 8
+MIN_PAGES_PER_WORKER = 4
+
+# Average ruling lines/rectangles per page above which tables are assumed to
+# be bordered and Camelot's lattice flavor is tried first
+RULED_TABLE_MIN_RULINGS = 5
+
+# Batch extraction uses up to MAX_BATCH_WORKERS processes and keeps at most
+# BATCH_PENDING_PER_WORKER files per worker in flight
+MAX_BATCH_WORKERS = 4
+BATCH_PENDING_PER_WORKER = 2
+
+def _extract_page_texts(pdf_path: Path, page_indices: range) -> List[Tuple[int, Optional[str], int, int]]:
+    """Extract text, image counts and ruling counts from a subset of pages with pdfplumber.
+    
+    Each call opens its own document: pdfminer reads objects through a shared
+    file handle, so pages of one open document cannot be parsed concurrently.
+    """
+    page_results = []
+    with _pdfplumber().open(pdf_path) as pdf:
+        for page_index in page_indices:
+            try:
+                page = pdf.pages[page_index]
+                page_results.append((
+                    page_index,
+                    page.extract_text(),
+                    len(page.images),
+                    len(page.lines) + len(page.rects)
+                ))
+            except Exception as e:
+                logger.warning("Failed to extract text from page %s: %s", page_index + 1, e)
+                page_results.append((page_index, None, 0, 0))
+    return page_results
+
+def _extract_pdf_worker(pdf_path: str) -> Dict[str, Any]:
+    """Analyze and extract a single PDF inside a batch worker process.
+    
+    Module-level so it can be pickled into the batch process pool.
+    """
+    return asyncio.run(PDFParser()._extract_single_pdf(Path(pdf_path)))
+
 class PDFParser:
     """
     Multi-stage PDF parser for medical documents.
     
     Extraction stages:
     1. Table extraction using Camelot
-    2. Text extraction using pdfplumber
+    2. Text extraction using PyMuPDF, or pdfplumber when it is unavailable
     3. Fallback text extraction using PyPDF2
     """
     
+    # Keywords used to detect tabular results and form fields
+    _TABLE_KEYWORDS = ('test', 'result', 'value', 'normal', 'abnormal', 'range', 'units')
+    _FORM_KEYWORDS = ('name:', 'date:', 'id:', 'patient', 'dob:')
+    
     def __init__(self):
         """Initialize PDF parser."""
         self.supported_formats = ['.pdf']
         
-    async def extract_tables(self, pdf_path: Path) -> Dict[str, Any]:
+        self._batch_pool: Optional[ProcessPoolExecutor] = None
+        self._batch_workers = min(os.cpu_count() or 1, MAX_BATCH_WORKERS)
+        
+    async def extract_tables(self, pdf_path: Path, has_ruled_tables: Optional[bool] = None) -> Dict[str, Any]:
         """
         Extract tables from PDF using Camelot.
         
         Args:
             pdf_path: Path to PDF file
+            has_ruled_tables: Ruling hint from analyze_document_structure; picks
+                the flavor tried first (lattice when unknown)
             
         Returns:
             Dictionary containing extracted tables and metadata
         """
+        return await asyncio.to_thread(self._extract_tables_sync, pdf_path, has_ruled_tables)
+    
+    def _extract_tables_sync(self, pdf_path: Path, has_ruled_tables: Optional[bool]) -> Dict[str, Any]:
+        """Blocking Camelot extraction behind extract_tables."""
         try:
-            logger.info(f"Extracting tables from PDF: {pdf_path.name}")
+            logger.info("Extracting tables from PDF: %s", pdf_path.name)
             
             if not CAMELOT_AVAILABLE:
                 logger.warning("Camelot not available, skipping table extraction")
@@ -60,32 +132,31 @@ class PDFParser:
             if not pdf_path.exists():
                 raise FileNotFoundError(f"PDF file not found: {pdf_path}")
             
-            # Extract tables using Camelot
-            tables = camelot.read_pdf(
-                str(pdf_path),
-                flavor='lattice',  # Try lattice first (for bordered tables)
-                pages='all'
-            )
+            # Lattice handles bordered tables, stream handles whitespace-aligned
+            # ones; start with the flavor the page rulings point to
+            flavor = 'stream' if has_ruled_tables is False else 'lattice'
+            tables = _camelot().read_pdf(str(pdf_path), flavor=flavor, pages='all')
             
-            # If no tables found with lattice, try stream method
+            # If no tables found, try the other flavor
             if len(tables) == 0:
-                logger.info("No tables found with lattice method, trying stream method")
-                tables = camelot.read_pdf(
-                    str(pdf_path),
-                    flavor='stream',  # For tables without borders
-                    pages='all'
-                )
+                fallback_flavor = 'lattice' if flavor == 'stream' else 'stream'
+                logger.info("No tables found with %s method, trying %s method", flavor, fallback_flavor)
+                flavor = fallback_flavor
+                tables = _camelot().read_pdf(str(pdf_path), flavor=flavor, pages='all')
             
             # Process extracted tables
             processed_tables = []
+            seen_pages = set()
             for i, table in enumerate(tables):
+                seen_pages.add(table.page)
                 try:
                     # Get table data as pandas DataFrame
                     df = table.df
                     
                     # Convert to list of lists for easier processing
-                    table_data = df.values.tolist()
-                    headers = df.columns.tolist()
+                    split = df.to_dict("split")
+                    table_data = split["data"]
+                    headers = split["columns"]
                     
                     table_info = {
                         "table_id": i,
@@ -96,29 +167,29 @@ class PDFParser:
                         "headers": headers,
                         "data": table_data,
                         "shape": df.shape,
-                        "extraction_method": "camelot_" + tables.flavor
+                        "extraction_method": "camelot_" + flavor
                     }
                     
                     processed_tables.append(table_info)
-                    logger.info(f"Extracted table {i} from page {table.page} with accuracy {table.accuracy:.2f}")
+                    logger.info("Extracted table %s from page %s with accuracy %.2f", i, table.page, table.accuracy)
                     
                 except Exception as e:
-                    logger.error(f"Failed to process table {i}: {str(e)}")
+                    logger.error("Failed to process table %s: %s", i, e)
                     continue
             
             result = {
                 "tables": processed_tables,
-                "method": f"camelot_{tables.flavor}",
-                "pages_processed": len(set(table.page for table in tables)) if tables else 0,
+                "method": f"camelot_{flavor}",
+                "pages_processed": len(seen_pages),
                 "total_tables": len(processed_tables),
                 "extraction_successful": len(processed_tables) > 0
             }
             
-            logger.info(f"Table extraction completed: {len(processed_tables)} tables found")
+            logger.info("Table extraction completed: %s tables found", len(processed_tables))
             return result
             
         except Exception as e:
-            logger.error(f"Table extraction failed: {str(e)}", exc_info=True)
+            logger.error("Table extraction failed: %s", e, exc_info=True)
             return {
                 "tables": [],
                 "method": "camelot_error",
@@ -127,48 +198,46 @@ class PDFParser:
                 "extraction_successful": False
             }
     
-    async def extract_text(self, pdf_path: Path) -> Dict[str, Any]:
+    async def extract_text(self, pdf_path: Path, parsed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Extract text from PDF using pdfplumber.
+        Extract text from PDF using PyMuPDF, falling back to pdfplumber.
         
         Args:
             pdf_path: Path to PDF file
+            parsed: Page data from _open_and_parse, reused instead of reparsing
             
         Returns:
             Dictionary containing extracted text and metadata
         """
         try:
-            logger.info(f"Extracting text from PDF: {pdf_path.name}")
+            logger.info("Extracting text from PDF: %s", pdf_path.name)
             
             if not pdf_path.exists():
                 raise FileNotFoundError(f"PDF file not found: {pdf_path}")
             
-            extracted_text = ""
             page_texts = []
+            text_parts = []
             extraction_method = "pdfplumber"
             
-            if PDFPLUMBER_AVAILABLE:
-                # Use pdfplumber for text extraction
-                with pdfplumber.open(pdf_path) as pdf:
-                    for page_num, page in enumerate(pdf.pages):
-                        try:
-                            page_text = page.extract_text()
-                            if page_text:
-                                page_texts.append({
-                                    "page_number": page_num + 1,
-                                    "text": page_text,
-                                    "char_count": len(page_text)
-                                })
-                                extracted_text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                            
-                        except Exception as e:
-                            logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
-                            continue
+            if parsed is None and (PYMUPDF_AVAILABLE or PDFPLUMBER_AVAILABLE):
+                parsed = await self._open_and_parse(pdf_path)
+            
+            if parsed is not None:
+                extraction_method = parsed["method"]
+                for page_num, page_text, _, _ in parsed["pages"]:
+                    if page_text:
+                        page_texts.append({
+                            "page_number": page_num + 1,
+                            "text": page_text,
+                            "char_count": len(page_text)
+                        })
+                        text_parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}\n")
+                extracted_text = "".join(text_parts)
             else:
                 # Fallback to PyPDF2
-                logger.warning("pdfplumber not available, using PyPDF2 fallback")
+                logger.warning("PyMuPDF and pdfplumber not available, using PyPDF2 fallback")
                 extraction_method = "pypdf2_fallback"
-                extracted_text, page_texts = await self._extract_text_pypdf2(pdf_path)
+                extracted_text, page_texts = await asyncio.to_thread(self._extract_text_pypdf2, pdf_path)
             
             result = {
                 "text": extracted_text,
@@ -179,11 +248,11 @@ class PDFParser:
                 "extraction_successful": len(extracted_text.strip()) > 0
             }
             
-            logger.info(f"Text extraction completed: {len(extracted_text)} characters from {len(page_texts)} pages")
+            logger.info("Text extraction completed: %s characters from %s pages", len(extracted_text), len(page_texts))
             return result
             
         except Exception as e:
-            logger.error(f"Text extraction failed: {str(e)}", exc_info=True)
+            logger.error("Text extraction failed: %s", e, exc_info=True)
             return {
                 "text": "",
                 "pages": [],
@@ -192,11 +261,68 @@ class PDFParser:
                 "extraction_successful": False
             }
     
-    async def _extract_text_pypdf2(self, pdf_path: Path) -> Tuple[str, List[Dict[str, Any]]]:
+    async def _open_and_parse(self, pdf_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Open a PDF once and collect the per-page data shared by text
+        extraction and structure analysis.
+        
+        Returns:
+            Dictionary with the backend used and (page_index, text, image_count,
+            ruling_count) for every page, or None when neither PyMuPDF nor
+            pdfplumber is installed
+        """
+        # MuPDF's C text extraction is much faster than pdfminer; both run off
+        # the event loop
+        if PYMUPDF_AVAILABLE:
+            pages = await asyncio.to_thread(self._extract_pages_pymupdf, pdf_path)
+            return {"method": "pymupdf", "pages": pages}
+        if PDFPLUMBER_AVAILABLE:
+            pages = await asyncio.to_thread(self._extract_pages_pdfplumber, pdf_path)
+            return {"method": "pdfplumber", "pages": pages}
+        return None
+    
+    def _extract_pages_pymupdf(self, pdf_path: Path) -> List[Tuple[int, Optional[str], int, int]]:
+        """Extract text, image counts and ruling counts from every page with PyMuPDF."""
+        page_results = []
+        with pymupdf.open(pdf_path) as doc:
+            for page_index, page in enumerate(doc):
+                try:
+                    page_text = page.get_text("text", sort=True).rstrip("\n")
+                    rulings = sum(
+                        1 for path in page.get_cdrawings()
+                        for item in path["items"] if item[0] in ("l", "re")
+                    )
+                    page_results.append((page_index, page_text, len(page.get_images()), rulings))
+                except Exception as e:
+                    logger.warning("Failed to extract text from page %s: %s", page_index + 1, e)
+                    page_results.append((page_index, None, 0, 0))
+        return page_results
+    
+    def _extract_pages_pdfplumber(self, pdf_path: Path) -> List[Tuple[int, Optional[str], int, int]]:
+        """Extract per-page text, image counts and ruling counts across a thread pool."""
+        with _pdfplumber().open(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+        
+        workers = min(MAX_PAGE_WORKERS, max(1, page_count // MIN_PAGES_PER_WORKER))
+        if workers == 1:
+            return _extract_page_texts(pdf_path, range(page_count))
+        
+        # Each worker takes every n-th page so long documents balance evenly
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_extract_page_texts, pdf_path, range(offset, page_count, workers))
+                for offset in range(workers)
+            ]
+            page_results = [item for future in as_completed(futures) for item in future.result()]
+        
+        page_results.sort(key=lambda item: item[0])
+        return page_results
+    
+    def _extract_text_pypdf2(self, pdf_path: Path) -> Tuple[str, List[Dict[str, Any]]]:
         """Fallback text extraction using PyPDF2."""
         try:
-            extracted_text = ""
             page_texts = []
+            text_parts = []
             
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -210,27 +336,46 @@ class PDFParser:
                                 "text": page_text,
                                 "char_count": len(page_text)
                             })
-                            extracted_text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+                            text_parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}\n")
                             
                     except Exception as e:
-                        logger.warning(f"PyPDF2 failed on page {page_num + 1}: {str(e)}")
+                        logger.warning("PyPDF2 failed on page %s: %s", page_num + 1, e)
                         continue
             
-            return extracted_text, page_texts
+            return "".join(text_parts), page_texts
             
         except Exception as e:
-            logger.error(f"PyPDF2 extraction failed: {str(e)}")
+            logger.error("PyPDF2 extraction failed: %s", e)
             return "", []
     
     async def extract_metadata(self, pdf_path: Path) -> Dict[str, Any]:
         """Extract metadata from PDF file."""
+        return await asyncio.to_thread(self._extract_metadata_sync, pdf_path)
+    
+    def _extract_metadata_sync(self, pdf_path: Path) -> Dict[str, Any]:
+        """Blocking metadata extraction behind extract_metadata."""
         try:
-            logger.info(f"Extracting metadata from PDF: {pdf_path.name}")
+            logger.info("Extracting metadata from PDF: %s", pdf_path.name)
             
             metadata = {}
             
-            if PDFPLUMBER_AVAILABLE:
-                with pdfplumber.open(pdf_path) as pdf:
+            if PYMUPDF_AVAILABLE:
+                with pymupdf.open(pdf_path) as doc:
+                    metadata = {
+                        "page_count": doc.page_count,
+                        "pdf_metadata": doc.metadata or {},
+                        "method": "pymupdf"
+                    }
+                    
+                    # Get page dimensions
+                    if doc.page_count:
+                        first_page = doc[0].rect
+                        metadata["page_dimensions"] = {
+                            "width": first_page.width,
+                            "height": first_page.height
+                        }
+            elif PDFPLUMBER_AVAILABLE:
+                with _pdfplumber().open(pdf_path) as pdf:
                     metadata = {
                         "page_count": len(pdf.pages),
                         "pdf_metadata": pdf.metadata or {},
@@ -262,17 +407,21 @@ class PDFParser:
                 "file_extension": pdf_path.suffix
             })
             
-            logger.info(f"PDF metadata extracted: {metadata.get('page_count', 0)} pages")
+            logger.info("PDF metadata extracted: %s pages", metadata.get('page_count', 0))
             return metadata
             
         except Exception as e:
-            logger.error(f"Metadata extraction failed: {str(e)}")
+            logger.error("Metadata extraction failed: %s", e)
             return {"error": str(e), "method": "extraction_failed"}
     
     async def extract_images(self, pdf_path: Path, extract_path: Optional[Path] = None) -> Dict[str, Any]:
         """Extract images from PDF for OCR processing."""
+        return await asyncio.to_thread(self._extract_images_sync, pdf_path, extract_path)
+    
+    def _extract_images_sync(self, pdf_path: Path, extract_path: Optional[Path]) -> Dict[str, Any]:
+        """Blocking image discovery behind extract_images."""
         try:
-            logger.info(f"Extracting images from PDF: {pdf_path.name}")
+            logger.info("Extracting images from PDF: %s", pdf_path.name)
             
             extracted_images = []
             
@@ -285,7 +434,7 @@ class PDFParser:
             else:
                 extract_path.mkdir(parents=True, exist_ok=True)
             
-            with pdfplumber.open(pdf_path) as pdf:
+            with _pdfplumber().open(pdf_path) as pdf:
                 for page_num, page in enumerate(pdf.pages):
                     try:
                         # Extract images from page
@@ -306,11 +455,11 @@ class PDFParser:
                                     })
                                     
                                 except Exception as e:
-                                    logger.warning(f"Failed to extract image {img_num + 1} from page {page_num + 1}: {str(e)}")
+                                    logger.warning("Failed to extract image %s from page %s: %s", img_num + 1, page_num + 1, e)
                                     continue
                                     
                     except Exception as e:
-                        logger.warning(f"Failed to process images on page {page_num + 1}: {str(e)}")
+                        logger.warning("Failed to process images on page %s: %s", page_num + 1, e)
                         continue
             
             result = {
@@ -320,17 +469,17 @@ class PDFParser:
                 "extract_path": str(extract_path)
             }
             
-            logger.info(f"Image extraction completed: {len(extracted_images)} images found")
+            logger.info("Image extraction completed: %s images found", len(extracted_images))
             return result
             
         except Exception as e:
-            logger.error(f"Image extraction failed: {str(e)}")
+            logger.error("Image extraction failed: %s", e)
             return {"images": [], "method": "extraction_error", "error": str(e)}
     
-    async def analyze_document_structure(self, pdf_path: Path) -> Dict[str, Any]:
+    async def analyze_document_structure(self, pdf_path: Path, parsed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze PDF document structure for better extraction strategy."""
         try:
-            logger.info(f"Analyzing document structure: {pdf_path.name}")
+            logger.info("Analyzing document structure: %s", pdf_path.name)
             
             analysis = {
                 "has_tables": False,
@@ -341,142 +490,202 @@ class PDFParser:
                 "confidence": 0.5
             }
             
-            if not PDFPLUMBER_AVAILABLE:
-                return analysis
-            
-            with pdfplumber.open(pdf_path) as pdf:
-                total_text_length = 0
-                table_indicators = 0
-                form_indicators = 0
-                image_count = 0
-                
-                for page in pdf.pages:
-                    # Analyze text content
-                    page_text = page.extract_text() or ""
-                    total_text_length += len(page_text)
-                    
-                    # Look for table indicators
-                    if any(indicator in page_text.lower() for indicator in 
-                           ['test', 'result', 'value', 'normal', 'abnormal', 'range', 'units']):
-                        table_indicators += 1
-                    
-                    # Look for form indicators
-                    if any(indicator in page_text.lower() for indicator in 
-                           ['name:', 'date:', 'id:', 'patient', 'dob:']):
-                        form_indicators += 1
-                    
-                    # Check for images
-                    if hasattr(page, 'images') and page.images:
-                        image_count += len(page.images)
+            if parsed is None:
+                if not (PYMUPDF_AVAILABLE or PDFPLUMBER_AVAILABLE):
+                    return analysis
+                parsed = await self._open_and_parse(pdf_path)
+            
+            pages = parsed["pages"]
+            ruling_count = sum(page[3] for page in pages)
+            total_text_length = 0
+            table_indicators = 0
+            form_indicators = 0
+            image_count = 0
+            
+            for _, page_text, page_images, _ in pages:
+                # Analyze text content
+                page_text = page_text or ""
+                total_text_length += len(page_text)
                 
-                # Make recommendations based on analysis
-                analysis.update({
-                    "has_tables": table_indicators > 0,
-                    "has_forms": form_indicators > 0,
-                    "has_images": image_count > 0,
-                    "text_heavy": total_text_length > 1000,
-                    "page_count": len(pdf.pages),
-                    "total_text_length": total_text_length,
-                    "table_indicators": table_indicators,
-                    "form_indicators": form_indicators,
-                    "image_count": image_count
-                })
+                # Look for table and form indicators
+                has_table, has_form = self._scan_indicators(page_text)
+                table_indicators += has_table
+                form_indicators += has_form
                 
-                # Determine recommended extraction method
-                if table_indicators > len(pdf.pages) * 0.5:
-                    analysis["recommended_extraction"] = "tables"
-                    analysis["confidence"] = 0.8
-                elif total_text_length > 500:
-                    analysis["recommended_extraction"] = "text"
-                    analysis["confidence"] = 0.7
-                elif image_count > 0:
-                    analysis["recommended_extraction"] = "ocr"
-                    analysis["confidence"] = 0.6
-                else:
-                    analysis["recommended_extraction"] = "hybrid"
-                    analysis["confidence"] = 0.5
-            
-            logger.info(f"Document analysis completed: {analysis['recommended_extraction']} extraction recommended")
+                # Check for images
+                image_count += page_images
+            
+            # Make recommendations based on analysis
+            analysis.update({
+                "has_tables": table_indicators > 0,
+                "has_forms": form_indicators > 0,
+                "has_images": image_count > 0,
+                "text_heavy": total_text_length > 1000,
+                "page_count": len(pages),
+                "total_text_length": total_text_length,
+                "table_indicators": table_indicators,
+                "form_indicators": form_indicators,
+                "image_count": image_count,
+                "has_ruled_tables": bool(pages) and ruling_count / len(pages) > RULED_TABLE_MIN_RULINGS
+            })
+            
+            # Determine recommended extraction method
+            if table_indicators > len(pages) * 0.5:
+                analysis["recommended_extraction"] = "tables"
+                analysis["confidence"] = 0.8
+            elif total_text_length > 500:
+                analysis["recommended_extraction"] = "text"
+                analysis["confidence"] = 0.7
+            elif image_count > 0:
+                analysis["recommended_extraction"] = "ocr"
+                analysis["confidence"] = 0.6
+            else:
+                analysis["recommended_extraction"] = "hybrid"
+                analysis["confidence"] = 0.5
+            
+            logger.info("Document analysis completed: %s extraction recommended", analysis['recommended_extraction'])
             return analysis
             
         except Exception as e:
-            logger.error(f"Document structure analysis failed: {str(e)}")
+            logger.error("Document structure analysis failed: %s", e)
             return {"error": str(e), "recommended_extraction": "text", "confidence": 0.3}
     
+    def _scan_indicators(self, page_text: str) -> Tuple[bool, bool]:
+        """Check a page for table and form keywords."""
+        # str's substring search runs in C and beats a regex alternation, which
+        # re tries branch by branch at every position of the page
+        lowered = page_text.lower()
+        return (
+            any(keyword in lowered for keyword in self._TABLE_KEYWORDS),
+            any(keyword in lowered for keyword in self._FORM_KEYWORDS)
+        )
+    
+    async def _extract_single_pdf(self, pdf_path: Path) -> Dict[str, Any]:
+        """Analyze a PDF and extract its text and tables in the recommended order."""
+        try:
+            # Parse the document once; analysis and text extraction share the page text
+            parsed = await self._open_and_parse(pdf_path)
+            
+            # Analyze document structure first
+            analysis = await self.analyze_document_structure(pdf_path, parsed)
+            
+            # Extract based on recommendation
+            if analysis["recommended_extraction"] == "tables":
+                tables = await self.extract_tables(pdf_path, analysis.get("has_ruled_tables"))
+                text = await self.extract_text(pdf_path, parsed)
+                return {
+                    "file_path": str(pdf_path),
+                    "tables": tables,
+                    "text": text,
+                    "analysis": analysis,
+                    "primary_method": "tables"
+                }
+            else:
+                text = await self.extract_text(pdf_path, parsed)
+                tables = await self.extract_tables(pdf_path, analysis.get("has_ruled_tables"))
+                return {
+                    "file_path": str(pdf_path),
+                    "text": text,
+                    "tables": tables,
+                    "analysis": analysis,
+                    "primary_method": "text"
+                }
+                
+        except Exception as e:
+            logger.error("Batch extraction failed for %s: %s", pdf_path, e)
+            return {
+                "file_path": str(pdf_path),
+                "error": str(e),
+                "extraction_successful": False
+            }
+    
     def is_pdf_file(self, file_path: Path) -> bool:
         """Check if file is a PDF."""
+        # Common spellings avoid building the suffix and lowercased copies
+        name = file_path.name
+        if name.endswith(('.pdf', '.PDF')):
+            return len(name) > 4
         return file_path.suffix.lower() == '.pdf'
     
     def get_supported_formats(self) -> List[str]:
         """Get list of supported file formats."""
         return self.supported_formats.copy()
     
-    async def batch_extract(self, pdf_paths: List[Path]) -> List[Dict[str, Any]]:
-        """Extract data from multiple PDFs in parallel."""
+    def _get_batch_pool(self) -> ProcessPoolExecutor:
+        """Get the process pool used for batch extraction, creating it on first use."""
+        if self._batch_pool is None:
+            # PDF parsing is CPU-bound Python that holds the GIL, so batches are
+            # spread across worker processes. Spawned workers avoid inheriting
+            # threads or Ghostscript state from the server process.
+            self._batch_pool = ProcessPoolExecutor(
+                max_workers=self._batch_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._batch_pool
+    
+    def close(self) -> None:
+        """Shut down the batch worker processes, if any were started."""
+        if self._batch_pool is not None:
+            self._batch_pool.shutdown(wait=True, cancel_futures=True)
+            self._batch_pool = None
+    
+    async def batch_extract(self, pdf_paths: List[Path]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract data from multiple PDFs in parallel.
+        
+        Results are yielded as each file finishes, not in input order. Only a
+        few files per worker are in flight at once, so memory stays bounded by
+        the pool size rather than the batch size.
+        """
+        pending = {}
         try:
-            logger.info(f"Starting batch PDF extraction for {len(pdf_paths)} files")
-            
-            results = []
-            
-            # Process PDFs concurrently (limit concurrency to avoid resource issues)
-            semaphore = asyncio.Semaphore(3)  # Max 3 concurrent extractions
-            
-            async def extract_single_pdf(pdf_path: Path) -> Dict[str, Any]:
-                async with semaphore:
+            logger.info("Starting batch PDF extraction for %s files", len(pdf_paths))
+            
+            # Each PDF is analyzed and extracted in its own worker process
+            loop = asyncio.get_running_loop()
+            pool = self._get_batch_pool()
+            max_pending = self._batch_workers * BATCH_PENDING_PER_WORKER
+            remaining = iter(pdf_paths)
+            processed = 0
+            
+            while True:
+                for pdf_path in remaining:
+                    task = loop.run_in_executor(pool, _extract_pdf_worker, str(pdf_path))
+                    pending[task] = pdf_path
+                    if len(pending) >= max_pending:
+                        break
+                
+                if not pending:
+                    break
+                
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pdf_path = pending.pop(task)
+                    processed += 1
                     try:
-                        # Analyze document structure first
-                        analysis = await self.analyze_document_structure(pdf_path)
-                        
-                        # Extract based on recommendation
-                        if analysis["recommended_extraction"] == "tables":
-                            tables = await self.extract_tables(pdf_path)
-                            text = await self.extract_text(pdf_path)
-                            return {
-                                "file_path": str(pdf_path),
-                                "tables": tables,
-                                "text": text,
-                                "analysis": analysis,
-                                "primary_method": "tables"
-                            }
-                        else:
-                            text = await self.extract_text(pdf_path)
-                            tables = await self.extract_tables(pdf_path)
-                            return {
-                                "file_path": str(pdf_path),
-                                "text": text,
-                                "tables": tables,
-                                "analysis": analysis,
-                                "primary_method": "text"
-                            }
-                            
+                        yield task.result()
                     except Exception as e:
-                        logger.error(f"Batch extraction failed for {pdf_path}: {str(e)}")
-                        return {
+                        # Handle exceptions raised in the worker
+                        logger.error("Batch extraction exception for file %s: %s", pdf_path, e)
+                        yield {
                             "file_path": str(pdf_path),
                             "error": str(e),
                             "extraction_successful": False
                         }
             
-            # Execute all extractions
-            tasks = [extract_single_pdf(pdf_path) for pdf_path in pdf_paths]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle any exceptions in results
-            processed_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"Batch extraction exception for file {i}: {str(result)}")
-                    processed_results.append({
-                        "file_path": str(pdf_paths[i]) if i < len(pdf_paths) else "unknown",
-                        "error": str(result),
-                        "extraction_successful": False
-                    })
-                else:
-                    processed_results.append(result)
-            
-            logger.info(f"Batch PDF extraction completed: {len(processed_results)} files processed")
-            return processed_results
+            logger.info("Batch PDF extraction completed: %s files processed", processed)
             
         except Exception as e:
-            logger.error(f"Batch PDF extraction failed: {str(e)}", exc_info=True)
-            return [{"error": str(e), "extraction_successful": False}]
+            logger.error("Batch PDF extraction failed: %s", e, exc_info=True)
+            yield {"error": str(e), "extraction_successful": False}
+        finally:
+            # Drop queued work if the consumer stops early
+            for task in pending:
+                task.cancel()
+    
+    async def batch_extract_list(self, pdf_paths: List[Path]) -> List[Dict[str, Any]]:
+        """Extract data from multiple PDFs and return all results in input order."""
+        order = {str(pdf_path): i for i, pdf_path in enumerate(pdf_paths)}
+        results = [result async for result in self.batch_extract(pdf_paths)]
+        results.sort(key=lambda result: order.get(result.get("file_path"), len(order)))
+        return results
@@ -5,11 +5,15 @@ Main application setup with middleware, routers, and startup/shutdown events.
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+import httpx
+import itertools
 import logging
+import queue
+import secrets
 import time
-import uuid
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 from app.core.config import settings
 from app.core.exceptions import (
@@ -19,6 +23,8 @@ from app.core.exceptions import (
     PrivacyException
 )
 from app.ml.registry import ModelRegistry
+from app.services.detection_service import DetectionService
+from app.services.extraction_service import ExtractionService
 from app.core.privacy import PrivacyManager
 from app.core.security import SecurityManager
 
@@ -33,56 +39,76 @@ from app.routers import (
     health
 )
 
-# Configure logging for HIPAA compliance
+# Configure logging for HIPAA compliance. Records bound for the audit log file
+# are queued and written by a background listener, keeping disk I/O out of
+# request handling; QueueHandler formats them before they are queued.
+log_queue = queue.SimpleQueue()
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler('healthcare_app.log')
+        QueueHandler(log_queue)
     ]
 )
+log_listener = QueueListener(
+    log_queue,
+    RotatingFileHandler('healthcare_app.log', maxBytes=50_000_000, backupCount=5)
+)
 logger = logging.getLogger(__name__)
 
-# Global instances
-model_registry = None
-privacy_manager = None
-security_manager = None
+# Request IDs: a random per-process prefix plus a monotonic counter, so IDs stay
+# unique across workers and sort in arrival order without a urandom call per request
+_REQUEST_ID_PREFIX = secrets.token_hex(8)
+_request_counter = itertools.count()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application startup and shutdown event handler.
     Manages model loading and cleanup operations.
+    Shared services live on app.state for request handlers.
     """
-    global model_registry, privacy_manager, security_manager
-    
     # Startup
+    log_listener.start()
     logger.info("Starting healthcare risk assessment API...")
     
     try:
         # Initialize privacy manager
-        privacy_manager = PrivacyManager()
+        app.state.privacy_manager = PrivacyManager()
         logger.info("Privacy manager initialized")
         
         # Initialize model registry
-        model_registry = ModelRegistry()
-        await model_registry.initialize()
+        app.state.model_registry = ModelRegistry()
+        await app.state.model_registry.initialize()
         logger.info("Model registry initialized")
+        
+        # Initialize detection service (shared so concurrent requests batch together)
+        app.state.detection_service = DetectionService(app.state.model_registry)
+        await app.state.detection_service.warm_up_explainers()
+        logger.info("Detection service initialized")
+        
+        # Initialize extraction service (shared so its worker pools and caches
+        # outlive individual requests)
+        app.state.extraction_service = ExtractionService()
+        logger.info("Extraction service initialized")
 
+        # Shared HTTP client for outbound calls such as health probes
+        app.state.http_client = httpx.AsyncClient(timeout=5)
+        
+        # /metrics snapshot cache; CPU usage is measured from this point on
+        app.state.metrics_cache = None
+        health.prime_system_metrics()
+        
         # Initialize security manager
-        security_manager = SecurityManager()
+        app.state.security_manager = SecurityManager()
         logger.info("Security manager initialized")
         
-        # Store in app state
-        app.state.model_registry = model_registry
-        app.state.privacy_manager = privacy_manager
-        app.state.security_manager = security_manager
-        
         logger.info("Application startup completed successfully")
         
     except Exception as e:
-        logger.error(f"Failed to initialize application: {e}")
+        logger.error("Failed to initialize application: %s", e)
+        log_listener.stop()
         raise
     
     yield
@@ -90,19 +116,32 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down healthcare risk assessment API...")
     
-    if privacy_manager:
+    if privacy_manager := app.state.privacy_manager:
         await privacy_manager.cleanup_all_sessions()
         logger.info("Privacy manager cleaned up")
     
-    if model_registry:
+    if detection_service := app.state.detection_service:
+        await detection_service.close()
+        logger.info("Detection service stopped")
+    
+    if extraction_service := app.state.extraction_service:
+        await extraction_service.close()
+        logger.info("Extraction service stopped")
+    
+    if model_registry := app.state.model_registry:
         model_registry.cleanup()
         logger.info("Model registry cleaned up")
 
-    if security_manager:
+    if http_client := app.state.http_client:
+        await http_client.aclose()
+        logger.info("HTTP client closed")
+    
+    if app.state.security_manager:
         # Security manager doesn't need cleanup
         logger.info("Security manager cleanup completed")
     
     logger.info("Application shutdown completed")
+    log_listener.stop()
 
 # Create FastAPI application
 app = FastAPI(
@@ -111,7 +150,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add security middleware
@@ -143,7 +183,7 @@ async def add_request_id_middleware(request: Request, call_next):
     Add unique request ID for audit logging and tracing.
     Essential for HIPAA compliance and debugging.
     """
-    request_id = str(uuid.uuid4())
+    request_id = f"{_REQUEST_ID_PREFIX}-{next(_request_counter):012x}"
     request.state.request_id = request_id
     
     # Add to response headers
@@ -162,8 +202,8 @@ async def logging_middleware(request: Request, call_next):
     
     # Log request (without sensitive data)
     logger.info(
-        f"Request: {request.method} {request.url.path} "
-        f"- RequestID: {getattr(request.state, 'request_id', 'unknown')}"
+        "Request: %s %s - RequestID: %s",
+        request.method, request.url.path, getattr(request.state, 'request_id', 'unknown')
     )
     
     response = await call_next(request)
@@ -171,9 +211,8 @@ async def logging_middleware(request: Request, call_next):
     # Log response
     process_time = time.time() - start_time
     logger.info(
-        f"Response: {response.status_code} "
-        f"- Time: {process_time:.4f}s "
-        f"- RequestID: {getattr(request.state, 'request_id', 'unknown')}"
+        "Response: %s - Time: %.4fs - RequestID: %s",
+        response.status_code, process_time, getattr(request.state, 'request_id', 'unknown')
     )
     
     return response
@@ -183,9 +222,9 @@ async def logging_middleware(request: Request, call_next):
 async def validation_exception_handler(request: Request, exc: ValidationException):
     """Handle validation errors with detailed feedback."""
     request_id = getattr(request.state, 'request_id', 'unknown')
-    logger.warning(f"Validation error - RequestID: {request_id} - {exc.detail}")
+    logger.warning("Validation error - RequestID: %s - %s", request_id, exc.detail)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400,
         content={
             "error": "Validation Error",
@@ -201,9 +240,9 @@ async def validation_exception_handler(request: Request, exc: ValidationExceptio
 async def model_exception_handler(request: Request, exc: ModelException):
     """Handle ML model errors."""
     request_id = getattr(request.state, 'request_id', 'unknown')
-    logger.error(f"Model error - RequestID: {request_id} - {exc.detail}")
+    logger.error("Model error - RequestID: %s - %s", request_id, exc.detail)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Model Processing Error",
@@ -217,9 +256,9 @@ async def model_exception_handler(request: Request, exc: ModelException):
 async def document_exception_handler(request: Request, exc: DocumentError):
     """Handle document processing errors."""
     request_id = getattr(request.state, 'request_id', 'unknown')
-    logger.error(f"Document error - RequestID: {request_id} - {exc.detail}")
+    logger.error("Document error - RequestID: %s - %s", request_id, exc.detail)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Document Processing Error",
@@ -233,9 +272,9 @@ async def document_exception_handler(request: Request, exc: DocumentError):
 async def privacy_exception_handler(request: Request, exc: PrivacyException):
     """Handle privacy and session management errors."""
     request_id = getattr(request.state, 'request_id', 'unknown')
-    logger.error(f"Privacy error - RequestID: {request_id} - {exc.detail}")
+    logger.error("Privacy error - RequestID: %s - %s", request_id, exc.detail)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=403,
         content={
             "error": "Privacy Error",
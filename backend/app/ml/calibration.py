@@ -18,6 +18,30 @@ from app.core.schemas import ConditionEnum
 
 logger = logging.getLogger(__name__)
 
+class IsotonicCalibrator:
+    """
+    Isotonic mapping from a model's positive-class probability to a
+    calibrated probability.
+    
+    Works on the base model's output rather than wrapping the model, so it is
+    fitted once on held-out predictions and applied as
+    calibrator.predict_proba(probabilities.reshape(-1, 1))[:, 1].
+    """
+    
+    def __init__(self):
+        """Initialize the underlying isotonic regression."""
+        self.isotonic = IsotonicRegression(out_of_bounds="clip")
+    
+    def fit(self, probabilities: np.ndarray, labels: np.ndarray) -> "IsotonicCalibrator":
+        """Fit the mapping on uncalibrated probabilities and true labels."""
+        self.isotonic.fit(np.ravel(probabilities), labels)
+        return self
+    
+    def predict_proba(self, probabilities: np.ndarray) -> np.ndarray:
+        """Return calibrated [negative, positive] class probabilities."""
+        calibrated = self.isotonic.predict(np.ravel(probabilities))
+        return np.column_stack([1 - calibrated, calibrated])
+
 class ModelCalibrator:
     """
     Model calibration utilities for improving probability estimates.
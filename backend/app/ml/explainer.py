@@ -3,11 +3,13 @@ Model explainability module using SHAP for interpretable ML predictions.
 Provides feature importance and prediction explanations for health risk models.
 """
 
+import hashlib
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 import pandas as pd
 from datetime import datetime
+from cachetools import LRUCache
 
 # SHAP imports with error handling
 try:
@@ -38,11 +40,13 @@ class ModelExplainer:
         """Initialize model explainer."""
         self.explainers = {}  # Cache explainers for different models
         self.feature_names = {}  # Feature names for different conditions
-        self.explanation_cache = {}  # Cache recent explanations
+        # Cache recent explanations; repeat patients skip SHAP entirely
+        self.explanation_cache = LRUCache(maxsize=settings.SHAP_CACHE_SIZE)
         
     async def explain_prediction(self, model: Any, features: pd.DataFrame,
                                condition: ConditionEnum, 
-                               background_data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+                               background_data: Optional[pd.DataFrame] = None,
+                               model_version: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate explanation for a model prediction.
         
@@ -51,26 +55,54 @@ class ModelExplainer:
             features: Input features for prediction
             condition: Medical condition being predicted
             background_data: Optional background dataset for SHAP
+            model_version: Version of the model, part of the explanation cache key
             
         Returns:
             Dictionary containing explanation results
         """
         try:
+            cache_key = self._explanation_cache_key(model, features, condition, model_version)
+            cached_explanation = self.explanation_cache.get(cache_key)
+            if cached_explanation is not None:
+                logger.debug(f"Using cached explanation for {condition.value}")
+                return cached_explanation
+            
             logger.info(f"Generating explanation for {condition.value}")
             
             if SHAP_AVAILABLE:
-                return await self._generate_shap_explanation(
+                explanation = await self._generate_shap_explanation(
                     model, features, condition, background_data
                 )
             else:
-                return await self._generate_fallback_explanation(
+                explanation = await self._generate_fallback_explanation(
                     model, features, condition
                 )
+            
+            self.explanation_cache[cache_key] = explanation
+            return explanation
                 
         except Exception as e:
             logger.error(f"Explanation generation failed: {str(e)}", exc_info=True)
             return await self._generate_fallback_explanation(model, features, condition)
     
+    async def prepare_explainer(self, model: Any, condition: ConditionEnum):
+        """Build and cache the SHAP explainer for a model ahead of its first explanation."""
+        if SHAP_AVAILABLE:
+            await self._get_shap_explainer(model, condition)
+    
+    def _explanation_cache_key(self, model: Any, features: pd.DataFrame,
+                               condition: ConditionEnum, model_version: Optional[str]) -> str:
+        """Hash the model identity, feature names and feature values into a cache key."""
+        digest = hashlib.sha256()
+        digest.update(f"{condition.value}|{type(model).__name__}|{id(model)}|{model_version}|".encode())
+        digest.update("|".join(map(str, features.columns)).encode())
+        try:
+            # Raw float bytes are far cheaper to produce than a JSON dump
+            digest.update(np.ascontiguousarray(features.to_numpy(dtype=np.float64)).tobytes())
+        except (TypeError, ValueError):
+            digest.update(features.to_json(orient="split", index=False).encode())
+        return digest.hexdigest()
+    
     async def _generate_shap_explanation(self, model: Any, features: pd.DataFrame,
                                        condition: ConditionEnum,
                                        background_data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
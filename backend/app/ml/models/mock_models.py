@@ -3,17 +3,40 @@ Mock model generator for development and testing.
 Creates realistic mock models that behave like trained ML models.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.model_selection import train_test_split
 from sklearn.datasets import make_classification
 import joblib
+from joblib import Parallel, delayed
 
 from app.core.schemas import ConditionEnum
+from app.ml.calibration import IsotonicCalibrator
+
+# Intel's oneDAL-backed estimator is a drop-in replacement that trains much
+# faster; fall back to stock scikit-learn when the extension is not installed
+try:
+    from sklearnex.linear_model import LogisticRegression
+    SKLEARNEX_AVAILABLE = True
+except ImportError:
+    from sklearn.linear_model import LogisticRegression
+    SKLEARNEX_AVAILABLE = False
+
+# joblib picks up lz4 on its own when installed; it compresses almost as well
+# as zlib at a fraction of the cost, so prefer it and fall back to zlib level 3
+try:
+    import lz4  # noqa: F401
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+MODEL_COMPRESSION = ("lz4", 3) if LZ4_AVAILABLE else 3
+MODEL_PICKLE_PROTOCOL = 5
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +48,58 @@ class MockModelGenerator:
     for development, testing, and demonstration purposes.
     """
     
+    # Scale, offset and clip range of the continuous synthetic features: age
+    # (18-90 years), BMI (15-50), systolic BP (90-200 mmHg), diastolic BP
+    # (60-120 mmHg), total cholesterol (120-350 mg/dL), HDL cholesterol
+    # (20-100 mg/dL), fasting glucose (70-300 mg/dL) and HbA1c (4-14%), as
+    # column vectors that broadcast over a feature-major block
+    _CONTINUOUS_SCALE = np.array([[15], [8], [25], [15], [50], [20], [40], [2]], dtype=float)
+    _CONTINUOUS_OFFSET = np.array([[50], [22], [120], [80], [180], [45], [90], [5.5]])
+    _CONTINUOUS_LOW = np.array([[18], [15], [90], [60], [120], [20], [70], [4]], dtype=float)
+    _CONTINUOUS_HIGH = np.array([[90], [50], [200], [120], [350], [100], [300], [14]], dtype=float)
+    
+    # Realistic prevalence for medical conditions
+    CONDITION_PREVALENCES = {
+        ConditionEnum.DIABETES: 0.11,      # 11% prevalence
+        ConditionEnum.HEART_DISEASE: 0.06,  # 6% prevalence
+        ConditionEnum.STROKE: 0.03,         # 3% prevalence
+        ConditionEnum.CKD: 0.15,           # 15% prevalence
+        ConditionEnum.LIVER_DISEASE: 0.04,  # 4% prevalence
+        ConditionEnum.ANEMIA: 0.25,        # 25% prevalence
+        ConditionEnum.THYROID: 0.12        # 12% prevalence
+    }
+    
+    # Feature names for mock models
+    FEATURE_NAMES = (
+        "age",
+        "bmi",
+        "bp_systolic",
+        "bp_diastolic",
+        "cholesterol_total",
+        "cholesterol_hdl",
+        "glucose_fasting",
+        "hba1c",
+        "smoking_current",
+        "exercise_regular",
+        "alcohol_consumption",
+        "family_history_diabetes",
+        "family_history_heart_disease",
+        "gender_male",
+        "medication_count"
+    )
+    
     def __init__(self):
         """Initialize mock model generator."""
         self.random_state = 42
         
+        # Synthetic features and base estimators are identical for every
+        # condition, so they are built once and shared; only the labels and
+        # calibrators differ per condition
+        self._base_data: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._calibration_split: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._base_models: Optional[Dict[str, Tuple[Any, str]]] = None
+        self._base_lock = threading.Lock()
+        
     async def create_condition_models(self, condition: ConditionEnum) -> Dict[str, Any]:
         """
         Create complete set of models for a medical condition.
@@ -39,70 +110,51 @@ class MockModelGenerator:
         Returns:
             Dictionary containing models, calibrators, and metadata
         """
+        # Training is CPU-bound; sklearn releases the GIL while fitting, so
+        # conditions built concurrently overlap in worker threads
+        return await asyncio.to_thread(self._build_condition_models, condition)
+    
+    def _build_condition_models(self, condition: ConditionEnum) -> Dict[str, Any]:
+        """Train calibrators and assemble the model set for one condition."""
         try:
             logger.info(f"Creating mock models for {condition.value}")
             
+            base_models = self._get_base_models()
+            
+            # Every model in the set shares one creation timestamp
+            now_iso = datetime.utcnow().isoformat()
+            
+            rng = self._condition_rng(condition)
+            
             # Generate synthetic training data
-            X, y = self._generate_synthetic_health_data(condition)
+            X, y = self._generate_synthetic_health_data(condition, rng)
             
-            # Create ensemble models
+            # Create ensemble models from the shared base estimators
             models = {}
             calibrators = {}
             
-            # Logistic Regression
-            lr_model = LogisticRegression(random_state=self.random_state)
-            lr_model.fit(X, y)
-            models["logistic_regression"] = {
-                "model": lr_model,
-                "version": "1.0.0-mock",
-                "loaded_at": datetime.utcnow().isoformat(),
-                "type": "sklearn_logistic_regression"
-            }
-            
-            # Random Forest (as XGBoost substitute)
-            rf_model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=6,
-                random_state=self.random_state
-            )
-            rf_model.fit(X, y)
-            models["xgboost"] = {
-                "model": rf_model,
-                "version": "1.0.0-mock",
-                "loaded_at": datetime.utcnow().isoformat(),
-                "type": "sklearn_random_forest"
-            }
+            for model_name, (model, model_type) in base_models.items():
+                models[model_name] = {
+                    "model": model,
+                    "version": "1.0.0-mock",
+                    "loaded_at": now_iso,
+                    "type": model_type
+                }
             
-            # Another Random Forest (as LightGBM substitute)
-            rf_model2 = RandomForestClassifier(
-                n_estimators=80,
-                max_depth=5,
-                min_samples_split=5,
-                random_state=self.random_state + 1
+            # Create calibrators on the held-out rows; the base models are
+            # already fitted, so only the calibration curves are trained
+            _, calibration_index = self._calibration_split
+            X_cal, y_cal = X[calibration_index], y[calibration_index]
+            fitted_calibrators = Parallel(n_jobs=len(models), prefer="threads")(
+                delayed(self._fit_calibrator)(model_name, model_info["model"], X_cal, y_cal)
+                for model_name, model_info in models.items()
             )
-            rf_model2.fit(X, y)
-            models["lightgbm"] = {
-                "model": rf_model2,
-                "version": "1.0.0-mock",
-                "loaded_at": datetime.utcnow().isoformat(),
-                "type": "sklearn_random_forest"
-            }
-            
-            # Create calibrators
-            for model_name, model_info in models.items():
-                try:
-                    calibrated_clf = CalibratedClassifierCV(
-                        model_info["model"], 
-                        method="isotonic", 
-                        cv=3
-                    )
-                    calibrated_clf.fit(X, y)
-                    calibrators[model_name] = calibrated_clf
-                except Exception as e:
-                    logger.warning(f"Failed to create calibrator for {model_name}: {str(e)}")
+            for model_name, calibrator in zip(models, fitted_calibrators):
+                if calibrator is not None:
+                    calibrators[model_name] = calibrator
             
             # Generate metadata
-            metadata = self._generate_model_metadata(condition, models)
+            metadata = self._generate_model_metadata(condition, models, now_iso, rng)
             
             result = {
                 "models": models,
@@ -117,8 +169,97 @@ class MockModelGenerator:
             logger.error(f"Mock model creation failed for {condition.value}: {str(e)}")
             raise
     
-    def _generate_synthetic_health_data(self, condition: ConditionEnum) -> tuple:
+    def _get_base_models(self) -> Dict[str, Tuple[Any, str]]:
+        """Train the condition-independent base estimators on first use."""
+        with self._base_lock:
+            if self._base_models is None:
+                self._base_models = self._train_base_models()
+        return self._base_models
+    
+    def _fit_calibrator(self, model_name: str, model: Any,
+                        X_cal: np.ndarray, y_cal: np.ndarray) -> Optional[IsotonicCalibrator]:
+        """Fit a calibrator for one model, returning None if calibration fails."""
+        try:
+            # One isotonic fit on the model's held-out predictions; the model
+            # itself is neither wrapped nor refitted
+            probabilities = model.predict_proba(X_cal)[:, 1]
+            return IsotonicCalibrator().fit(probabilities, y_cal)
+        except Exception as e:
+            logger.warning(f"Failed to create calibrator for {model_name}: {str(e)}")
+            return None
+    
+    def _train_base_models(self) -> Dict[str, Tuple[Any, str]]:
+        """Train the shared logistic regression and gradient boosting estimators."""
+        X, y = self._generate_base_health_data()
+        
+        # Hold out rows for calibration; the models never see them in training
+        train_index, calibration_index = train_test_split(
+            np.arange(len(y)),
+            test_size=0.2,
+            random_state=self.random_state
+        )
+        self._calibration_split = (train_index, calibration_index)
+        X, y = X[train_index], y[train_index]
+        
+        # Logistic Regression
+        logger.info(
+            f"Training logistic regression with "
+            f"{'scikit-learn-intelex' if SKLEARNEX_AVAILABLE else 'scikit-learn'}"
+        )
+        lr_model = LogisticRegression(random_state=self.random_state)
+        
+        # Histogram gradient boosting (as XGBoost substitute)
+        gbm_model = HistGradientBoostingClassifier(
+            max_iter=100,
+            max_depth=6,
+            random_state=self.random_state
+        )
+        
+        # Shallower histogram gradient boosting (as LightGBM substitute)
+        gbm_model2 = HistGradientBoostingClassifier(
+            max_iter=80,
+            max_depth=5,
+            random_state=self.random_state + 1
+        )
+        
+        # The fits are independent and spend most of their time in native
+        # code, so they run side by side in threads
+        Parallel(n_jobs=3, prefer="threads")(
+            delayed(model.fit)(X, y) for model in (lr_model, gbm_model, gbm_model2)
+        )
+        
+        return {
+            "logistic_regression": (lr_model, "sklearn_logistic_regression"),
+            "xgboost": (gbm_model, "sklearn_hist_gbm"),
+            "lightgbm": (gbm_model2, "sklearn_hist_gbm")
+        }
+    
+    def _condition_rng(self, condition: ConditionEnum) -> np.random.Generator:
+        """Get a child generator of random_state reserved for one condition.
+        
+        Each condition draws its label flips and metric noise from its own
+        stream, so results do not depend on how concurrent builds interleave.
+        """
+        condition_index = list(ConditionEnum).index(condition)
+        seed = np.random.SeedSequence(self.random_state, spawn_key=(condition_index,))
+        return np.random.default_rng(seed)
+    
+    def _generate_synthetic_health_data(self, condition: ConditionEnum,
+                                        rng: np.random.Generator) -> tuple:
         """Generate synthetic health data for model training."""
+        X, y = self._generate_base_health_data()
+        
+        # Adjust class balance based on condition prevalence
+        prevalence = self._get_condition_prevalence(condition)
+        y = self._adjust_prevalence(y.copy(), prevalence, rng)
+        
+        return X, y
+    
+    def _generate_base_health_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Generate the condition-independent synthetic features and labels once."""
+        if self._base_data is not None:
+            return self._base_data
+        
         n_samples = 1000
         n_features = 15
         
@@ -133,64 +274,40 @@ class MockModelGenerator:
             random_state=self.random_state
         )
         
-        # Modify features to be more health-realistic
-        X = self._make_health_realistic(X, condition)
-        
-        # Adjust class balance based on condition prevalence
-        prevalence = self._get_condition_prevalence(condition)
-        y = self._adjust_prevalence(y, prevalence)
+        # Modify features to be more health-realistic, then store them as
+        # float32 so the estimators work on half the bytes without upcasting
+        X = self._make_health_realistic(X).astype(np.float32)
         
-        return X, y
+        self._base_data = (X, y)
+        return self._base_data
     
-    def _make_health_realistic(self, X: np.ndarray, condition: ConditionEnum) -> np.ndarray:
-        """Transform synthetic data to be more health-realistic."""
-        # Scale features to realistic health ranges
-        X_realistic = X.copy()
-        
-        # Age (feature 0): 18-90 years
-        X_realistic[:, 0] = np.clip(X_realistic[:, 0] * 15 + 50, 18, 90)
-        
-        # BMI (feature 1): 15-50
-        X_realistic[:, 1] = np.clip(np.abs(X_realistic[:, 1]) * 8 + 22, 15, 50)
-        
-        # Systolic BP (feature 2): 90-200 mmHg
-        X_realistic[:, 2] = np.clip(np.abs(X_realistic[:, 2]) * 25 + 120, 90, 200)
-        
-        # Diastolic BP (feature 3): 60-120 mmHg
-        X_realistic[:, 3] = np.clip(np.abs(X_realistic[:, 3]) * 15 + 80, 60, 120)
-        
-        # Total Cholesterol (feature 4): 120-350 mg/dL
-        X_realistic[:, 4] = np.clip(np.abs(X_realistic[:, 4]) * 50 + 180, 120, 350)
-        
-        # HDL Cholesterol (feature 5): 20-100 mg/dL
-        X_realistic[:, 5] = np.clip(np.abs(X_realistic[:, 5]) * 20 + 45, 20, 100)
-        
-        # Fasting Glucose (feature 6): 70-300 mg/dL
-        X_realistic[:, 6] = np.clip(np.abs(X_realistic[:, 6]) * 40 + 90, 70, 300)
+    def _make_health_realistic(self, X: np.ndarray) -> np.ndarray:
+        """Transform synthetic data to be more health-realistic, in place."""
+        X_realistic = X
+        n_continuous = len(self._CONTINUOUS_SCALE)
         
-        # HbA1c (feature 7): 4-14%
-        X_realistic[:, 7] = np.clip(np.abs(X_realistic[:, 7]) * 2 + 5.5, 4, 14)
+        # Continuous features (0-7) are scaled to realistic health ranges in a
+        # feature-major buffer, so each in-place pass runs along whole columns.
+        # Every feature but age is folded to be non-negative first.
+        continuous = np.abs(X[:, :n_continuous].T, order="C")
+        continuous[0] = X[:, 0]
+        continuous *= self._CONTINUOUS_SCALE
+        continuous += self._CONTINUOUS_OFFSET
+        np.maximum(continuous, self._CONTINUOUS_LOW, out=continuous)
+        np.minimum(continuous, self._CONTINUOUS_HIGH, out=continuous)
+        X_realistic[:, :n_continuous] = continuous.T
         
         # Binary features (8-14): smoking, family history, etc.
-        for i in range(8, min(X_realistic.shape[1], 15)):
-            X_realistic[:, i] = (X_realistic[:, i] > 0).astype(float)
+        np.greater(X[:, n_continuous:15], 0, out=X_realistic[:, n_continuous:15])
         
         return X_realistic
     
     def _get_condition_prevalence(self, condition: ConditionEnum) -> float:
         """Get realistic prevalence for medical conditions."""
-        prevalences = {
-            ConditionEnum.DIABETES: 0.11,      # 11% prevalence
-            ConditionEnum.HEART_DISEASE: 0.06,  # 6% prevalence
-            ConditionEnum.STROKE: 0.03,         # 3% prevalence
-            ConditionEnum.CKD: 0.15,           # 15% prevalence
-            ConditionEnum.LIVER_DISEASE: 0.04,  # 4% prevalence
-            ConditionEnum.ANEMIA: 0.25,        # 25% prevalence
-            ConditionEnum.THYROID: 0.12        # 12% prevalence
-        }
-        return prevalences.get(condition, 0.10)
+        return self.CONDITION_PREVALENCES.get(condition, 0.10)
     
-    def _adjust_prevalence(self, y: np.ndarray, target_prevalence: float) -> np.ndarray:
+    def _adjust_prevalence(self, y: np.ndarray, target_prevalence: float,
+                           rng: np.random.Generator) -> np.ndarray:
         """Adjust class balance to match target prevalence."""
         current_prevalence = np.mean(y)
         
@@ -202,64 +319,48 @@ class MockModelGenerator:
         
         if n_positive_needed > n_positive_current:
             # Need more positive cases
-            negative_indices = np.where(y == 0)[0]
-            flip_indices = np.random.choice(
-                negative_indices, 
-                size=min(n_positive_needed - n_positive_current, len(negative_indices)),
-                replace=False
-            )
-            y[flip_indices] = 1
+            candidate_indices = np.flatnonzero(y == 0)
+            n_flip = n_positive_needed - n_positive_current
         else:
             # Need fewer positive cases
-            positive_indices = np.where(y == 1)[0]
-            flip_indices = np.random.choice(
-                positive_indices,
-                size=min(n_positive_current - n_positive_needed, len(positive_indices)),
-                replace=False
-            )
-            y[flip_indices] = 0
+            candidate_indices = np.flatnonzero(y == 1)
+            n_flip = n_positive_current - n_positive_needed
+        n_flip = min(n_flip, len(candidate_indices))
+        
+        if n_flip > 0:
+            # Pick a random subset by partitioning random keys instead of
+            # shuffling the whole candidate pool, then flip the labels in place
+            keys = rng.random(len(candidate_indices))
+            if n_flip < len(candidate_indices):
+                candidate_indices = candidate_indices[np.argpartition(keys, n_flip)[:n_flip]]
+            y[candidate_indices] ^= 1
         
         return y
     
     def _generate_model_metadata(self, condition: ConditionEnum, 
-                               models: Dict[str, Any]) -> Dict[str, Any]:
+                               models: Dict[str, Any], now_iso: str,
+                               rng: np.random.Generator) -> Dict[str, Any]:
         """Generate realistic metadata for mock models."""
         return {
             "condition": condition.value,
-            "created_at": datetime.utcnow().isoformat(),
-            "last_updated": datetime.utcnow().isoformat(),
+            "created_at": now_iso,
+            "last_updated": now_iso,
             "version": "1.0.0-mock",
             "description": f"Mock ensemble models for {condition.value} risk assessment",
             "model_type": "ensemble",
             "training_samples": 1000,
             "validation_method": "5-fold_cross_validation",
             "expected_features": self._get_feature_names(),
-            "performance": self._generate_mock_performance_metrics(),
+            "performance": self._generate_mock_performance_metrics(rng),
             "calibration_method": "isotonic",
             "is_mock": True
         }
     
     def _get_feature_names(self) -> List[str]:
         """Get feature names for mock models."""
-        return [
-            "age",
-            "bmi", 
-            "bp_systolic",
-            "bp_diastolic",
-            "cholesterol_total",
-            "cholesterol_hdl",
-            "glucose_fasting",
-            "hba1c",
-            "smoking_current",
-            "exercise_regular",
-            "alcohol_consumption",
-            "family_history_diabetes",
-            "family_history_heart_disease",
-            "gender_male",
-            "medication_count"
-        ]
+        return list(self.FEATURE_NAMES)
     
-    def _generate_mock_performance_metrics(self) -> Dict[str, Dict[str, float]]:
+    def _generate_mock_performance_metrics(self, rng: np.random.Generator) -> Dict[str, Dict[str, float]]:
         """Generate realistic performance metrics for mock models."""
         base_performance = {
             "logistic_regression": {
@@ -300,11 +401,18 @@ class MockModelGenerator:
             }
         }
         
-        # Add small random variations to make it more realistic
-        for model_name, metrics in base_performance.items():
-            for metric_name, value in metrics.items():
-                noise = np.random.normal(0, 0.01)  # Small random variation
-                base_performance[model_name][metric_name] = max(0, min(1, value + noise))
+        # Add small random variations to make it more realistic, drawing the
+        # noise for every model and metric at once
+        metric_names = list(base_performance["logistic_regression"])
+        values = np.array([
+            [metrics[name] for name in metric_names] for metrics in base_performance.values()
+        ])
+        values += rng.normal(0, 0.01, size=values.shape)
+        np.clip(values, 0.0, 1.0, out=values)
+        base_performance = {
+            model_name: dict(zip(metric_names, row))
+            for model_name, row in zip(base_performance, values.tolist())
+        }
         
         # Add ensemble performance
         base_performance["ensemble"] = {
@@ -340,7 +448,8 @@ class MockModelGenerator:
             models = model_data["models"]
             for model_name, model_info in models.items():
                 model_file = condition_path / f"{model_name}.pkl"
-                joblib.dump(model_info["model"], model_file)
+                joblib.dump(model_info["model"], model_file,
+                            compress=MODEL_COMPRESSION, protocol=MODEL_PICKLE_PROTOCOL)
                 logger.info(f"Saved mock model: {model_file}")
             
             # Save calibrators
@@ -350,7 +459,8 @@ class MockModelGenerator:
                 
                 for model_name, calibrator in model_data["calibrators"].items():
                     calibrator_file = calibrator_path / f"{model_name}_calibrator.pkl"
-                    joblib.dump(calibrator, calibrator_file)
+                    joblib.dump(calibrator, calibrator_file,
+                                compress=MODEL_COMPRESSION, protocol=MODEL_PICKLE_PROTOCOL)
                     logger.info(f"Saved mock calibrator: {calibrator_file}")
             
             # Save metadata
@@ -369,13 +479,19 @@ class MockModelGenerator:
     async def create_all_mock_models(self, save_path: str) -> Dict[str, bool]:
         """Create mock models for all conditions."""
         results = {}
+        conditions = list(ConditionEnum)
+        
+        # Conditions are independent, so they are trained concurrently
+        outcomes = await asyncio.gather(
+            *(self.create_mock_model_files(condition, save_path) for condition in conditions),
+            return_exceptions=True
+        )
         
-        for condition in ConditionEnum:
-            try:
-                success = await self.create_mock_model_files(condition, save_path)
-                results[condition.value] = success
-            except Exception as e:
-                logger.error(f"Failed to create mock models for {condition.value}: {str(e)}")
+        for condition, outcome in zip(conditions, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to create mock models for {condition.value}: {str(outcome)}")
                 results[condition.value] = False
+            else:
+                results[condition.value] = outcome
         
         return results
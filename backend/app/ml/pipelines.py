@@ -4,9 +4,9 @@ Standardized feature transformation for consistent model input.
 """
 
 import logging
+import warnings
 from typing import Dict, Any, List, Optional
 import numpy as np
-import pandas as pd
 from sklearn.preprocessing import StandardScaler, RobustScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
 
@@ -15,6 +15,14 @@ logger = logging.getLogger(__name__)
 class FeaturePipeline:
     """Feature engineering and preprocessing pipeline."""
     
+    # Population means used to impute missing key vital metrics
+    VITAL_DEFAULTS = {
+        'age': 45.0,
+        'bmi': 25.0,
+        'bp_systolic': 120.0,
+        'bp_diastolic': 80.0
+    }
+    
     def __init__(self):
         """Initialize feature pipeline components."""
         self.scalers = {}
@@ -28,20 +36,35 @@ class FeaturePipeline:
         try:
             logger.debug(f"Transforming {len(features)} raw features")
             
-            # Convert to DataFrame for easier processing
-            df = pd.DataFrame([features])
+            # A single sample is handled as a plain vector: building a
+            # one-row DataFrame costs far more than the transformations
+            numeric_names = [
+                name for name, value in features.items()
+                if self._is_numeric_feature(name, value)
+            ]
+            values = np.array(
+                [np.nan if features[name] is None else features[name] for name in numeric_names],
+                dtype=np.float64
+            )
             
             # Handle missing values
-            df = self._handle_missing_values(df)
-            
-            # Apply feature engineering
-            df = self._engineer_features(df)
+            defaults = np.array([self.VITAL_DEFAULTS.get(name, np.nan) for name in numeric_names])
+            values = np.where(np.isnan(values), defaults, values)
+            numeric_values = dict(zip(numeric_names, values.tolist()))
             
-            # Normalize/scale features
-            df = self._scale_features(df)
+            transformed_features = {
+                name: 'unknown' if value is None else value
+                for name, value in features.items()
+            }
+            transformed_features.update(numeric_values)
             
-            # Convert back to dictionary
-            transformed_features = df.iloc[0].to_dict()
+            # Apply feature engineering, treating the sample as one-row columns
+            engineered = self._engineer_columns({
+                name: values[i:i + 1] for i, name in enumerate(numeric_names)
+            })
+            transformed_features.update(
+                (name, float(column[0])) for name, column in engineered.items()
+            )
             
             logger.debug(f"Feature transformation completed: {len(transformed_features)} features")
             return transformed_features
@@ -51,67 +74,95 @@ class FeaturePipeline:
             # Return original features if transformation fails
             return features
     
-    def _handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Handle missing values with appropriate imputation strategies."""
-        # Separate numeric and categorical columns
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        categorical_cols = df.select_dtypes(exclude=[np.number]).columns
+    def transform_batch(self, feature_dicts: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Transform many samples into one model-ready matrix.
+        
+        Columns are the raw numeric features, in feature_order when it is set
+        and otherwise in first-seen order, followed by the engineered features
+        whose inputs are present. The matrix can be passed straight to a
+        single predict_proba call. This is CPU-bound; async callers should run
+        it with asyncio.to_thread.
+        """
+        if self.feature_order:
+            raw_columns = list(self.feature_order)
+        else:
+            raw_columns = list(dict.fromkeys(
+                name
+                for features in feature_dicts
+                for name, value in features.items()
+                if self._is_numeric_feature(name, value)
+            ))
+        column_index = {name: i for i, name in enumerate(raw_columns)}
         
-        # Impute numeric values with median (more robust than mean)
-        for col in numeric_cols:
-            if df[col].isna().any():
-                if col in ['age', 'bmi', 'bp_systolic', 'bp_diastolic']:
-                    # Use population means for key vital metrics
-                    defaults = {
-                        'age': 45.0,
-                        'bmi': 25.0,
-                        'bp_systolic': 120.0,
-                        'bp_diastolic': 80.0
-                    }
-                    df[col].fillna(defaults.get(col, df[col].median()), inplace=True)
-                else:
-                    df[col].fillna(df[col].median(), inplace=True)
+        X = np.full((len(feature_dicts), len(raw_columns)), np.nan, dtype=np.float32)
+        for row, features in enumerate(feature_dicts):
+            for name, value in features.items():
+                i = column_index.get(name)
+                if i is not None and value is not None and self._is_numeric_feature(name, value):
+                    X[row, i] = value
         
-        # Impute categorical values with mode or default
-        for col in categorical_cols:
-            if df[col].isna().any():
-                df[col].fillna('unknown', inplace=True)
+        # Handle missing values: population defaults for key vitals, batch
+        # medians for everything else
+        if X.size:
+            with warnings.catch_warnings():
+                # All-missing columns have no median and stay NaN
+                warnings.simplefilter("ignore", RuntimeWarning)
+                fill_values = np.nanmedian(X, axis=0)
+            for name, default in self.VITAL_DEFAULTS.items():
+                if name in column_index:
+                    fill_values[column_index[name]] = default
+            X = np.where(np.isnan(X), fill_values, X)
         
-        return df
+        # Apply feature engineering column-wise
+        columns = {name: X[:, i] for name, i in column_index.items()}
+        engineered = self._engineer_columns(columns)
+        if not engineered:
+            return X
+        return np.column_stack([X, *engineered.values()]).astype(np.float32, copy=False)
     
-    def _engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Apply feature engineering transformations."""
+    def _is_numeric_feature(self, name: str, value: Any) -> bool:
+        """Check whether a raw feature is numeric, counting missing key vitals."""
+        if value is None:
+            return name in self.VITAL_DEFAULTS
+        return isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_))
+    
+    def _engineer_columns(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Apply feature engineering transformations to whole feature columns."""
+        engineered = {}
+        
         # BMI categories
-        if 'bmi' in df.columns:
-            df['bmi_category_underweight'] = (df['bmi'] < 18.5).astype(float)
-            df['bmi_category_normal'] = ((df['bmi'] >= 18.5) & (df['bmi'] < 25)).astype(float)
-            df['bmi_category_overweight'] = ((df['bmi'] >= 25) & (df['bmi'] < 30)).astype(float)
-            df['bmi_category_obese'] = (df['bmi'] >= 30).astype(float)
+        if 'bmi' in columns:
+            bmi = columns['bmi']
+            engineered['bmi_category_underweight'] = bmi < 18.5
+            engineered['bmi_category_normal'] = (bmi >= 18.5) & (bmi < 25)
+            engineered['bmi_category_overweight'] = (bmi >= 25) & (bmi < 30)
+            engineered['bmi_category_obese'] = bmi >= 30
         
         # Blood pressure categories
-        if 'bp_systolic' in df.columns and 'bp_diastolic' in df.columns:
-            df['bp_category_normal'] = ((df['bp_systolic'] < 120) & (df['bp_diastolic'] < 80)).astype(float)
-            df['bp_category_elevated'] = ((df['bp_systolic'] >= 120) & (df['bp_systolic'] < 130) & (df['bp_diastolic'] < 80)).astype(float)
-            df['bp_category_stage1'] = (((df['bp_systolic'] >= 130) & (df['bp_systolic'] < 140)) | ((df['bp_diastolic'] >= 80) & (df['bp_diastolic'] < 90))).astype(float)
-            df['bp_category_stage2'] = ((df['bp_systolic'] >= 140) | (df['bp_diastolic'] >= 90)).astype(float)
+        if 'bp_systolic' in columns and 'bp_diastolic' in columns:
+            systolic = columns['bp_systolic']
+            diastolic = columns['bp_diastolic']
+            engineered['bp_category_normal'] = (systolic < 120) & (diastolic < 80)
+            engineered['bp_category_elevated'] = (systolic >= 120) & (systolic < 130) & (diastolic < 80)
+            engineered['bp_category_stage1'] = ((systolic >= 130) & (systolic < 140)) | ((diastolic >= 80) & (diastolic < 90))
+            engineered['bp_category_stage2'] = (systolic >= 140) | (diastolic >= 90)
         
         # Age groups
-        if 'age' in df.columns:
-            df['age_group_young'] = (df['age'] < 30).astype(float)
-            df['age_group_middle'] = ((df['age'] >= 30) & (df['age'] < 60)).astype(float)
-            df['age_group_senior'] = (df['age'] >= 60).astype(float)
+        if 'age' in columns:
+            age = columns['age']
+            engineered['age_group_young'] = age < 30
+            engineered['age_group_middle'] = (age >= 30) & (age < 60)
+            engineered['age_group_senior'] = age >= 60
             
             # Age-squared for non-linear relationships
-            df['age_squared'] = df['age'] ** 2
+            engineered['age_squared'] = age ** 2
         
         # Lab value ratios and combinations
-        if 'cholesterol_total' in df.columns and 'cholesterol_hdl' in df.columns:
-            df['cholesterol_ratio'] = df['cholesterol_total'] / (df['cholesterol_hdl'] + 1e-8)  # Avoid division by zero
+        if 'cholesterol_total' in columns and 'cholesterol_hdl' in columns:
+            engineered['cholesterol_ratio'] = columns['cholesterol_total'] / (columns['cholesterol_hdl'] + 1e-8)  # Avoid division by zero
         
-        if 'glucose_fasting' in df.columns and 'hba1c' in df.columns:
-            df['glucose_hba1c_product'] = df['glucose_fasting'] * df['hba1c']
+        if 'glucose_fasting' in columns and 'hba1c' in columns:
+            engineered['glucose_hba1c_product'] = columns['glucose_fasting'] * columns['hba1c']
         
-        # Risk factor combinations
-        risk_factors = []
-        if 'current_smoker' in df.columns:
-            risk_factors.append('current_smoker')
\ No newline at end of file
+        return engineered
@@ -7,17 +7,27 @@ import logging
 import pickle
 import joblib
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, FrozenSet, Tuple
 from datetime import datetime
 import asyncio
 import json
 
+import numpy as np
+from fastapi import Request
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 import xgboost as xgb
 import lightgbm as lgb
 from sklearn.calibration import CalibratedClassifierCV
 
+# HummingBird compiles tree ensembles into tensor programs that score large
+# batches faster; without it every prediction uses the native estimator
+try:
+    from hummingbird.ml import convert as hummingbird_convert
+    HUMMINGBIRD_AVAILABLE = True
+except ImportError:
+    HUMMINGBIRD_AVAILABLE = False
+
 from app.core.config import settings
 from app.core.schemas import ConditionEnum
 from app.ml.calibration import ModelCalibrator
@@ -25,6 +35,21 @@ from app.ml.models.mock_models import MockModelGenerator
 
 logger = logging.getLogger(__name__)
 
+# String feature values read as true; any other string is false
+_TRUE_STRINGS = frozenset(['true', 'yes', '1'])
+
+def _to_model_value(value: Any) -> float:
+    """Convert one raw feature value to the numeric form the models expect."""
+    # Convert boolean/categorical to numeric
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, str):
+        return 1.0 if value.lower() in _TRUE_STRINGS else 0.0
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0  # Default for unconvertible values
+
 class ModelRegistry:
     """
     Centralized registry for ML models used in health risk assessment.
@@ -43,12 +68,18 @@ class ModelRegistry:
         self.explainers = {}  # condition -> explainer
         self.model_metadata = {}  # condition -> metadata
         self.is_initialized = False
+        # Models only change on (re)initialization, so condition lookups for
+        # request validation and listings are built once and shared
+        self._available_conditions: Optional[FrozenSet[str]] = None
+        self._condition_info = {}  # condition name -> summary info
+        self._feature_orders = {}  # condition -> model input feature names
         self.model_path = Path(settings.MODEL_REGISTRY_PATH)
         
     async def initialize(self):
         """Initialize and load all models."""
         try:
             logger.info("Initializing ML model registry")
+            self._clear_condition_caches()
             
             # Ensure model directory exists
             self.model_path.mkdir(parents=True, exist_ok=True)
@@ -57,6 +88,8 @@ class ModelRegistry:
             for condition in ConditionEnum:
                 await self._load_condition_models(condition)
             
+            await asyncio.to_thread(self._compile_models)
+            
             self.is_initialized = True
             logger.info(f"Model registry initialized with {len(self.models)} conditions")
             
@@ -64,7 +97,25 @@ class ModelRegistry:
             logger.error(f"Model registry initialization failed: {str(e)}", exc_info=True)
             # Initialize with mock models for development/testing
             await self._initialize_mock_models()
+            await asyncio.to_thread(self._compile_models)
             self.is_initialized = True
+    
+    def _compile_models(self):
+        """Compile tree ensembles to tensor form for batched inference."""
+        if not HUMMINGBIRD_AVAILABLE:
+            return
+        
+        for condition, models in self.models.items():
+            for model_name, model_info in models.items():
+                model = model_info["model"]
+                # Linear models gain nothing from compilation
+                if hasattr(model, "coef_"):
+                    continue
+                try:
+                    model_info["compiled_model"] = hummingbird_convert(model, "torch")
+                    logger.info(f"Compiled {model_name} for {condition.value}")
+                except Exception as e:
+                    logger.warning(f"Model compilation failed for {condition.value} {model_name}: {str(e)}")
             
     async def _load_condition_models(self, condition: ConditionEnum):
         """Load ensemble models for a specific condition."""
@@ -188,6 +239,34 @@ class ModelRegistry:
             except Exception as e:
                 logger.error(f"Failed to create mock models for {condition.value}: {str(e)}")
     
+    def get_available_conditions(self) -> FrozenSet[str]:
+        """Get the names of conditions with loaded models."""
+        if self._available_conditions is None:
+            self._available_conditions = frozenset(condition.value for condition in self.models)
+        return self._available_conditions
+    
+    def get_condition_info(self, condition: str) -> Dict[str, Any]:
+        """Get summary information about a condition's models."""
+        if condition not in self._condition_info:
+            metadata = self.model_metadata.get(ConditionEnum(condition), {})
+            self._condition_info[condition] = {
+                "name": condition,
+                "display_name": condition.replace('_', ' ').title(),
+                "description": metadata.get("description", f"Risk assessment for {condition}"),
+                "model_version": metadata.get("version", "unknown"),
+                "accuracy": metadata.get("performance", {}).get("ensemble", {}).get("accuracy"),
+                "last_trained": metadata.get("last_updated"),
+                "required_features": metadata.get("expected_features", []),
+                "optional_features": []
+            }
+        return self._condition_info[condition]
+    
+    def _clear_condition_caches(self):
+        """Drop cached condition lookups after the loaded models change."""
+        self._available_conditions = None
+        self._condition_info.clear()
+        self._feature_orders.clear()
+    
     async def get_condition_models(self, condition: ConditionEnum) -> Dict[str, Any]:
         """Get all models for a specific condition."""
         if not self.is_initialized:
@@ -339,14 +418,14 @@ class ModelRegistry:
         predictions = []
         model_results = {}
         
+        # Convert features to format expected by the models once for all of them
+        feature_array = self.vectorize(condition, features)
+        
         # Get predictions from each model
         for model_name, model_info in models.items():
             try:
                 model = model_info["model"]
                 
-                # Convert features to format expected by model
-                feature_array = self._prepare_features_for_model(features, condition)
-                
                 # Get prediction probability
                 if hasattr(model, 'predict_proba'):
                     pred_proba = model.predict_proba(feature_array)
@@ -389,40 +468,30 @@ class ModelRegistry:
             "model_count": len(predictions)
         }
     
-    def _prepare_features_for_model(self, features: Dict[str, Any], condition: ConditionEnum) -> Any:
-        """Prepare features in the format expected by the models."""
-        import pandas as pd
-        import numpy as np
-        
-        # Get expected features for this condition
-        expected_features = self.model_metadata.get(condition, {}).get("expected_features", [])
-        
-        # Create feature array with expected features
-        feature_values = []
-        for feature_name in expected_features:
-            value = features.get(feature_name, 0)  # Default to 0 if missing
-            
-            # Handle different data types
-            if isinstance(value, (str, bool)):
-                # Convert boolean/categorical to numeric
-                if isinstance(value, bool):
-                    feature_values.append(1 if value else 0)
-                elif value.lower() in ['true', 'yes', '1']:
-                    feature_values.append(1)
-                elif value.lower() in ['false', 'no', '0']:
-                    feature_values.append(0)
-                else:
-                    feature_values.append(0)  # Default for unknown strings
-            else:
-                try:
-                    feature_values.append(float(value))
-                except (ValueError, TypeError):
-                    feature_values.append(0)  # Default for unconvertible values
-        
-        # Convert to numpy array and reshape for single prediction
-        feature_array = np.array(feature_values).reshape(1, -1)
+    def get_feature_order(self, condition: ConditionEnum) -> Tuple[str, ...]:
+        """Get the feature names, in model input order, for a condition."""
+        if condition not in self._feature_orders:
+            expected_features = self.model_metadata.get(condition, {}).get("expected_features", [])
+            self._feature_orders[condition] = tuple(expected_features)
+        return self._feature_orders[condition]
+    
+    def vectorize(self, condition: ConditionEnum, features: Dict[str, Any]) -> np.ndarray:
+        """Convert one sample's features into a (1, n_features) model input row."""
+        return self.prepare_feature_matrix([features], condition)
+    
+    def prepare_feature_matrix(self, feature_dicts: List[Dict[str, Any]],
+                               condition: ConditionEnum) -> np.ndarray:
+        """Convert several samples' features into one model input matrix."""
+        feature_order = self.get_feature_order(condition)
         
-        return feature_array
+        # One pass over the samples straight into a preallocated float32 buffer;
+        # missing features default to 0
+        return np.fromiter(
+            (_to_model_value(features.get(feature_name, 0))
+             for features in feature_dicts for feature_name in feature_order),
+            dtype=np.float32,
+            count=len(feature_dicts) * len(feature_order)
+        ).reshape(len(feature_dicts), len(feature_order))
     
     def cleanup(self):
         """Cleanup model registry resources."""
@@ -431,8 +500,9 @@ class ModelRegistry:
         self.calibrators.clear()
         self.explainers.clear()
         self.model_metadata.clear()
+        self._clear_condition_caches()
         self.is_initialized = False
 
-async def get_model_registry() -> ModelRegistry:
-    """Get the model registry instance."""
-    return ModelRegistry()
+def get_model_registry(request: Request) -> ModelRegistry:
+    """Dependency to get model registry."""
+    return request.app.state.model_registry
@@ -74,26 +74,22 @@ async def detect_risks(
         
         # Validate condition names
         available_conditions = model_registry.get_available_conditions()
-        invalid_conditions = [c for c in detection_request.conditions if c not in available_conditions]
+        invalid_conditions = set(detection_request.conditions) - available_conditions
         if invalid_conditions:
-            raise ValidationException(f"Invalid conditions: {invalid_conditions}. Available: {available_conditions}")
+            raise ValidationException(f"Invalid conditions: {sorted(invalid_conditions)}. Available: {sorted(available_conditions)}")
         
         # Prepare input data
         patient_data = session_data['patient_data']
         
-        # Include extracted lab values if available
+        # Include extracted lab values if available, merged into one dict in place
         lab_values = {}
-        if 'extractions' in session_data:
-            for file_id, extraction in session_data['extractions'].items():
-                if 'extraction_result' in extraction:
-                    file_lab_values = extraction['extraction_result'].get('lab_values', {})
-                    lab_values.update(file_lab_values)
+        for extraction in session_data.get('extractions', {}).values():
+            extraction_result = extraction.get('extraction_result')
+            if extraction_result:
+                lab_values |= extraction_result.get('lab_values', {})
         
         # Combine patient data with lab values
-        combined_data = {
-            **patient_data,
-            'lab_values': lab_values
-        }
+        combined_data = patient_data | {'lab_values': lab_values}
         
         # Run risk detection
         detection_results = await detection_service.detect_risks(
@@ -144,24 +140,16 @@ async def list_available_conditions(
     try:
         logger.info(f"Listing available conditions - RequestID: {request_id}")
         
-        conditions = model_registry.get_available_conditions()
-        condition_info = {}
+        conditions = sorted(model_registry.get_available_conditions())
         
-        for condition in conditions:
-            model_info = model_registry.get_condition_info(condition)
-            condition_info[condition] = {
-                "name": condition,
-                "display_name": model_info.get('display_name', condition.replace('_', ' ').title()),
-                "description": model_info.get('description', f"Risk assessment for {condition}"),
-                "model_version": model_info.get('version', 'unknown'),
-                "accuracy": model_info.get('accuracy', None),
-                "last_trained": model_info.get('last_trained', None),
-                "required_features": model_info.get('required_features', []),
-                "optional_features": model_info.get('optional_features', [])
-            }
+        # Per-condition info is cached by the registry and shared across requests
+        condition_info = {
+            condition: model_registry.get_condition_info(condition)
+            for condition in conditions
+        }
         
         return {
-            "available_conditions": list(conditions),
+            "available_conditions": conditions,
             "condition_details": condition_info,
             "total_conditions": len(conditions)
         }
@@ -192,7 +180,7 @@ async def get_model_info(
         
         available_conditions = model_registry.get_available_conditions()
         if condition not in available_conditions:
-            raise ValidationException(f"Invalid condition: {condition}. Available: {available_conditions}")
+            raise ValidationException(f"Invalid condition: {condition}. Available: {sorted(available_conditions)}")
         
         model_info = model_registry.get_detailed_condition_info(condition)
         
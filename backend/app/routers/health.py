@@ -5,8 +5,12 @@ Provides comprehensive health monitoring for production deployment.
 
 import logging
 import asyncio
+import tempfile
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any
+import httpx
 from fastapi import APIRouter, Request, HTTPException
 
 from app.core.schemas import HealthCheckResponse
@@ -15,6 +19,9 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Directory for the storage probe, created by the first storage check
+STORAGE_PROBE_DIR = Path(tempfile.gettempdir()) / "health_platform"
+
 
 @router.get("/", response_model=HealthCheckResponse)
 async def health_check(request: Request):
@@ -24,111 +31,28 @@ async def health_check(request: Request):
     """
     start_time = datetime.utcnow()
     
-    services_status = {
-        "api": {"status": "healthy", "details": {}},
-        "redis": {"status": "unknown", "details": {}},
-        "models": {"status": "unknown", "details": {}},
-        "storage": {"status": "unknown", "details": {}},
-        "external_apis": {"status": "unknown", "details": {}}
-    }
-    
-    overall_status = "healthy"
-    
-    # Check Redis connection
-    try:
-        redis_client = getattr(request.app.state, 'redis_client', None)
-        if redis_client:
-            await redis_client.ping()
-            
-            # Test basic operations
-            test_key = "health_check_test"
-            await redis_client.set(test_key, "test_value", ex=10)
-            test_value = await redis_client.get(test_key)
-            await redis_client.delete(test_key)
-            
-            if test_value == "test_value":
-                services_status["redis"]["status"] = "healthy"
-                services_status["redis"]["details"] = {
-                    "connection": "active",
-                    "read_write": "operational"
-                }
-            else:
-                raise Exception("Redis read/write test failed")
-        else:
-            services_status["redis"]["status"] = "not_configured"
-            services_status["redis"]["details"] = {"message": "Redis not configured"}
-            
-    except Exception as e:
-        services_status["redis"]["status"] = "unhealthy"
-        services_status["redis"]["details"] = {"error": str(e)}
-        # Don't mark overall status as degraded if Redis is just not running
-    
-    # Check ML models
-    try:
-        model_registry = request.app.state.model_registry
-        model_status = await model_registry.health_check()
-        
-        services_status["models"]["status"] = "healthy" if model_status["all_loaded"] else "degraded"
-        services_status["models"]["details"] = model_status
-        
-        if not model_status["all_loaded"]:
-            overall_status = "degraded"
-            
-    except Exception as e:
-        services_status["models"]["status"] = "unhealthy"
-        services_status["models"]["details"] = {"error": str(e)}
-        overall_status = "degraded"
-    
-    # Check file storage
-    try:
-        import tempfile
-        from pathlib import Path
-        
-        temp_dir = Path(tempfile.gettempdir()) / "health_platform"
-        temp_dir.mkdir(exist_ok=True)
-        
-        # Test file write/read
-        test_file = temp_dir / "health_check.txt"
-        test_file.write_text("health check test")
-        content = test_file.read_text()
-        test_file.unlink()
-        
-        if content == "health check test":
-            services_status["storage"]["status"] = "healthy"
-            services_status["storage"]["details"] = {
-                "temp_directory": str(temp_dir),
-                "read_write": "operational"
-            }
-        else:
-            raise Exception("File storage test failed")
-            
-    except Exception as e:
-        services_status["storage"]["status"] = "unhealthy"
-        services_status["storage"]["details"] = {"error": str(e)}
-        overall_status = "degraded"
-
-@router.get("/cors-test")
-async def cors_test():
-    """
-    Simple endpoint to test CORS functionality.
-    """
-    return {
-        "message": "CORS test successful",
-        "timestamp": datetime.utcnow().isoformat(),
-        "cors_enabled": True,
-        "allowed_origins": [
-            "http://localhost:3000",
-            "http://localhost:3001",
-            "http://127.0.0.1:3000",
-            "http://127.0.0.1:3001"
-        ]
-    }
+    # The probes are independent, so they run concurrently and the check
+    # takes as long as the slowest one
+    check_names = ["redis", "models", "storage", "external_apis"]
+    check_results = await asyncio.gather(
+        _check_redis(request),
+        _check_models(request),
+        _check_storage(),
+        _check_external_apis(request.app.state.http_client),
+        return_exceptions=True
+    )
     
-    # Check external APIs
-    external_status = await _check_external_apis()
-    services_status["external_apis"] = external_status
+    services_status = {"api": {"status": "healthy", "details": {}}}
+    for name, result in zip(check_names, check_results):
+        if isinstance(result, Exception):
+            result = {"status": "unhealthy", "details": {"error": str(result)}}
+        services_status[name] = result
     
-    if external_status["status"] == "degraded":
+    # Redis is optional, so only the other services can degrade the API
+    overall_status = "healthy"
+    if (services_status["models"]["status"] != "healthy"
+            or services_status["storage"]["status"] != "healthy"
+            or services_status["external_apis"]["status"] == "degraded"):
         overall_status = "degraded"
     
     # Calculate response time
@@ -152,6 +76,24 @@ async def cors_test():
     )
 
 
+@router.get("/cors-test")
+async def cors_test():
+    """
+    Simple endpoint to test CORS functionality.
+    """
+    return {
+        "message": "CORS test successful",
+        "timestamp": datetime.utcnow().isoformat(),
+        "cors_enabled": True,
+        "allowed_origins": [
+            "http://localhost:3000",
+            "http://localhost:3001",
+            "http://127.0.0.1:3000",
+            "http://127.0.0.1:3001"
+        ]
+    }
+
+
 @router.get("/ready")
 async def readiness_check(request: Request):
     """
@@ -192,27 +134,23 @@ async def get_metrics(request: Request):
     """
     Get system metrics for monitoring.
     """
+    # Scrapes within the cache TTL share one snapshot, kept per app as
+    # (monotonic expiry time, payload)
+    now = time.monotonic()
+    cached = getattr(request.app.state, 'metrics_cache', None)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+    
     try:
-        import psutil
-        import os
-        
-        # System metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        # System metrics (psutil reads /proc, so keep it off the event loop)
+        system_metrics = await asyncio.to_thread(_collect_system_metrics)
         
         # Application metrics
         redis_client = request.app.state.redis_client
         redis_info = await _get_redis_metrics(redis_client)
         
-        return {
-            "system": {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_available_gb": round(memory.available / (1024**3), 2),
-                "disk_percent": disk.percent,
-                "disk_free_gb": round(disk.free / (1024**3), 2)
-            },
+        metrics = {
+            "system": system_metrics,
             "redis": redis_info,
             "application": {
                 "environment": settings.FASTAPI_ENV,
@@ -222,6 +160,8 @@ async def get_metrics(request: Request):
             },
             "timestamp": datetime.utcnow()
         }
+        request.app.state.metrics_cache = (now + settings.METRICS_CACHE_TTL_SECONDS, metrics)
+        return metrics
         
     except Exception as e:
         logger.error(f"Error getting metrics: {str(e)}")
@@ -262,22 +202,126 @@ async def get_recent_logs(
         raise HTTPException(status_code=500, detail="Failed to retrieve logs")
 
 
-async def _check_external_apis() -> Dict[str, Any]:
+async def _check_redis(request: Request) -> Dict[str, Any]:
+    """
+    Check the Redis connection with a read/write round trip.
+    """
+    try:
+        redis_client = getattr(request.app.state, 'redis_client', None)
+        if redis_client:
+            # Test basic operations in one round trip
+            test_key = "health_check_test"
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.ping()
+                pipe.set(test_key, "test_value", ex=10)
+                pipe.get(test_key)
+                pipe.delete(test_key)
+                results = await pipe.execute()
+            test_value = results[2]
+            
+            if test_value in ("test_value", b"test_value"):
+                return {
+                    "status": "healthy",
+                    "details": {
+                        "connection": "active",
+                        "read_write": "operational"
+                    }
+                }
+            raise Exception("Redis read/write test failed")
+        
+        return {"status": "not_configured", "details": {"message": "Redis not configured"}}
+        
+    except Exception as e:
+        return {"status": "unhealthy", "details": {"error": str(e)}}
+
+
+async def _check_models(request: Request) -> Dict[str, Any]:
+    """
+    Check that the model registry has its models loaded.
+    """
+    try:
+        model_registry = request.app.state.model_registry
+        model_status = await model_registry.health_check()
+        
+        return {
+            "status": "healthy" if model_status["all_loaded"] else "degraded",
+            "details": model_status
+        }
+        
+    except Exception as e:
+        return {"status": "unhealthy", "details": {"error": str(e)}}
+
+
+async def _check_storage() -> Dict[str, Any]:
+    """
+    Check that temporary file storage is writable and readable.
+    """
+    try:
+        # Disk I/O runs in a worker thread so a slow disk cannot stall the loop
+        read_write_ok = await asyncio.to_thread(_storage_probe)
+        
+        if read_write_ok:
+            return {
+                "status": "healthy",
+                "details": {
+                    "temp_directory": str(STORAGE_PROBE_DIR),
+                    "read_write": "operational"
+                }
+            }
+        raise Exception("File storage test failed")
+        
+    except Exception as e:
+        return {"status": "unhealthy", "details": {"error": str(e)}}
+
+
+def _storage_probe() -> bool:
+    """
+    Write and read back an anonymous temp file; the OS removes it on close.
+    """
+    try:
+        probe_file = tempfile.NamedTemporaryFile(dir=STORAGE_PROBE_DIR, delete=True)
+    except FileNotFoundError:
+        # First check, or a temp cleaner removed the directory
+        STORAGE_PROBE_DIR.mkdir(exist_ok=True)
+        probe_file = tempfile.NamedTemporaryFile(dir=STORAGE_PROBE_DIR, delete=True)
+    
+    with probe_file:
+        probe_file.write(b"health check test")
+        probe_file.flush()
+        probe_file.seek(0)
+        return probe_file.read() == b"health check test"
+
+
+async def _check_external_apis(http_client: httpx.AsyncClient) -> Dict[str, Any]:
     """
     Check status of external API dependencies.
     """
+    # The probes are independent, so they run concurrently
+    google_maps_status, openai_status = await asyncio.gather(
+        _check_google_maps(http_client),
+        _check_openai()
+    )
     external_checks = {
-        "google_maps": {"status": "unknown", "details": {}},
-        "openai": {"status": "unknown", "details": {}}
+        "google_maps": google_maps_status,
+        "openai": openai_status
     }
     
     overall_external_status = "healthy"
+    if google_maps_status["status"] == "unhealthy":
+        overall_external_status = "degraded"
     
-    # Check Google Maps API
+    return {
+        "status": overall_external_status,
+        "details": external_checks
+    }
+
+
+async def _check_google_maps(http_client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    Check the Google Maps API key without blocking the event loop.
+    """
     try:
         if settings.GOOGLE_MAPS_API_KEY:
-            import requests
-            
             # Simple API key validation
             url = "https://maps.googleapis.com/maps/api/geocode/json"
             params = {
@@ -285,40 +329,55 @@ async def _check_external_apis() -> Dict[str, Any]:
                 "key": settings.GOOGLE_MAPS_API_KEY
             }
             
-            response = requests.get(url, params=params, timeout=5)
+            response = await http_client.get(url, params=params)
             
             if response.status_code == 200:
-                external_checks["google_maps"]["status"] = "healthy"
-                external_checks["google_maps"]["details"] = {"api_key": "valid"}
-            else:
-                external_checks["google_maps"]["status"] = "unhealthy"
-                external_checks["google_maps"]["details"] = {"api_key": "invalid"}
-                overall_external_status = "degraded"
-        else:
-            external_checks["google_maps"]["status"] = "not_configured"
-            external_checks["google_maps"]["details"] = {"api_key": "not_provided"}
-            
+                return {"status": "healthy", "details": {"api_key": "valid"}}
+            return {"status": "unhealthy", "details": {"api_key": "invalid"}}
+        
+        return {"status": "not_configured", "details": {"api_key": "not_provided"}}
+        
     except Exception as e:
-        external_checks["google_maps"]["status"] = "unhealthy"
-        external_checks["google_maps"]["details"] = {"error": str(e)}
-        overall_external_status = "degraded"
-    
-    # Check OpenAI API (if configured)
+        return {"status": "unhealthy", "details": {"error": str(e)}}
+
+
+async def _check_openai() -> Dict[str, Any]:
+    """
+    Check whether the OpenAI API is configured.
+    """
+    if settings.OPENAI_API_KEY:
+        return {"status": "configured", "details": {"api_key": "provided"}}
+    return {"status": "not_configured", "details": {"api_key": "not_provided"}}
+
+
+def prime_system_metrics() -> None:
+    """
+    Start psutil's CPU usage window so the first /metrics call reports a real value.
+    """
     try:
-        if settings.OPENAI_API_KEY:
-            external_checks["openai"]["status"] = "configured"
-            external_checks["openai"]["details"] = {"api_key": "provided"}
-        else:
-            external_checks["openai"]["status"] = "not_configured"
-            external_checks["openai"]["details"] = {"api_key": "not_provided"}
-            
-    except Exception as e:
-        external_checks["openai"]["status"] = "error"
-        external_checks["openai"]["details"] = {"error": str(e)}
+        import psutil
+    except ImportError:
+        return
+    psutil.cpu_percent(interval=None)
+
+
+def _collect_system_metrics() -> Dict[str, Any]:
+    """
+    Collect CPU, memory and disk usage.
+    """
+    import psutil
+    
+    # Non-blocking: CPU usage since the previous call instead of sampling for 1s
+    cpu_percent = psutil.cpu_percent(interval=None)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
     
     return {
-        "status": overall_external_status,
-        "details": external_checks
+        "cpu_percent": cpu_percent,
+        "memory_percent": memory.percent,
+        "memory_available_gb": round(memory.available / (1024**3), 2),
+        "disk_percent": disk.percent,
+        "disk_free_gb": round(disk.free / (1024**3), 2)
     }
 
 
@@ -327,7 +386,7 @@ async def _get_redis_metrics(redis_client) -> Dict[str, Any]:
     Get Redis-specific metrics.
     """
     try:
-        info = await redis_client.info()
+        info = await redis_client.info("clients", "memory", "stats")
         
         return {
             "connected_clients": info.get("connected_clients", 0),
@@ -3,12 +3,15 @@ ML detection service for health risk assessment.
 Manages ensemble model predictions with feature preparation and explanation generation.
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable, Awaitable
 from datetime import datetime
 import numpy as np
 import pandas as pd
+from fastapi import Request
 
+from app.core.config import settings
 from app.ml.registry import ModelRegistry
 from app.ml.pipelines import FeaturePipeline
 from app.ml.explainer import ModelExplainer
@@ -16,6 +19,122 @@ from app.core.schemas import ConditionEnum
 
 logger = logging.getLogger(__name__)
 
+class BatchScheduler:
+    """
+    Micro-batching layer for single-patient risk detection.
+    
+    Calls arriving within a short window are coalesced, scored with one model
+    call per condition and model, and each caller gets back its own row.
+    """
+    
+    def __init__(self, detect_batch: Callable[[List[Dict[str, Any]], Tuple[ConditionEnum, ...]],
+                                              Awaitable[List[Dict[ConditionEnum, Dict[str, Any]]]]],
+                 max_batch_size: int = 32, max_wait_ms: float = 10.0):
+        """
+        Initialize batch scheduler.
+        
+        Args:
+            detect_batch: Coroutine scoring a list of feature dicts for the given conditions
+            max_batch_size: Maximum number of calls coalesced into one batch
+            max_wait_ms: How long the first call of a batch waits for others
+        """
+        self.detect_batch = detect_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        # Batch currently being scored, so close() can fail its callers
+        self._in_flight: List[Tuple[Dict[str, Any], Tuple[ConditionEnum, ...], asyncio.Future]] = []
+    
+    async def submit(self, features: Dict[str, Any],
+                     conditions: Tuple[ConditionEnum, ...]) -> Dict[ConditionEnum, Dict[str, Any]]:
+        """Queue one sample and wait for its per-condition results."""
+        # Restart the worker if it has never run or has died
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, conditions, future))
+        return await future
+    
+    async def _run(self):
+        """Drain the queue into batches until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            self._in_flight = batch
+            try:
+                await self._dispatch(batch)
+            except Exception as e:
+                logger.error(f"Detection batch dispatch failed: {str(e)}", exc_info=True)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._in_flight = []
+    
+    async def _dispatch(self, batch: List[Tuple[Dict[str, Any], Tuple[ConditionEnum, ...], asyncio.Future]]):
+        """Score a batch, one call per distinct condition set, and resolve the callers."""
+        groups: Dict[Tuple[ConditionEnum, ...], List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        for features, conditions, future in batch:
+            # Callers that gave up (e.g. client disconnect) are not scored
+            if not future.done():
+                groups.setdefault(conditions, []).append((features, future))
+        
+        for conditions, items in groups.items():
+            try:
+                results = await self.detect_batch([features for features, _ in items], conditions)
+            except Exception as e:
+                logger.error(f"Batched risk detection failed: {str(e)}", exc_info=True)
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            if len(results) != len(items):
+                logger.error(f"Batched risk detection returned {len(results)} results for {len(items)} requests")
+            
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+            
+            # Callers without a result row must not wait forever
+            for _, future in items[len(results):]:
+                if not future.done():
+                    future.set_exception(RuntimeError("Batched risk detection returned too few results"))
+        
+        logger.debug(f"Scored detection batch of {len(batch)} requests in {len(groups)} groups")
+    
+    async def close(self):
+        """Stop the background worker and fail any calls still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        
+        pending = [future for _, _, future in self._in_flight]
+        self._in_flight = []
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            pending.append(future)
+        
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Detection service is shutting down"))
+
 class DetectionService:
     """
     ML detection service for multi-condition health risk assessment.
@@ -34,6 +153,13 @@ class DetectionService:
         self.feature_pipeline = FeaturePipeline()
         self.explainer = ModelExplainer()
         
+        # Concurrent single-patient requests are scored together
+        self.batch_scheduler = BatchScheduler(
+            self.detect_risks_batch,
+            max_batch_size=settings.DETECTION_BATCH_MAX_SIZE,
+            max_wait_ms=settings.DETECTION_BATCH_MAX_WAIT_MS
+        )
+        
     async def prepare_features(self, patient_data: Dict[str, Any]) -> pd.DataFrame:
         """
         Prepare features from patient data for ML model input.
@@ -79,59 +205,8 @@ class DetectionService:
                 raise ValueError(f"No models available for condition: {condition.value}")
             
             # Get ensemble predictions
-            ensemble_predictions = []
-            model_details = []
-            
-            for model_name, model_info in models.items():
-                try:
-                    model = model_info["model"]
-                    calibrator = model_info.get("calibrator")
-                    
-                    # Get prediction
-                    prediction = model.predict_proba(features)[:, 1]  # Probability of positive class
-                    
-                    # Apply calibration if available
-                    if calibrator:
-                        prediction = calibrator.predict_proba(prediction.reshape(-1, 1))[:, 1]
-                    
-                    ensemble_predictions.append(prediction[0])
-                    model_details.append({
-                        "model_name": model_name,
-                        "prediction": float(prediction[0]),
-                        "version": model_info.get("version", "1.0.0")
-                    })
-                    
-                except Exception as e:
-                    logger.warning(f"Prediction failed for {model_name}: {str(e)}")
-                    continue
-            
-            if not ensemble_predictions:
-                raise ValueError(f"All models failed for condition: {condition.value}")
-            
-            # Calculate ensemble prediction (weighted average)
-            ensemble_weights = [0.4, 0.35, 0.25]  # LR, XGBoost, LightGBM weights
-            if len(ensemble_predictions) == 3:
-                risk_score = np.average(ensemble_predictions, weights=ensemble_weights)
-            else:
-                risk_score = np.mean(ensemble_predictions)
-            
-            # Calculate confidence interval
-            confidence_interval = self._calculate_confidence_interval(
-                ensemble_predictions, risk_score
-            )
-            
-            # Determine risk level
-            risk_level = self._determine_risk_level(risk_score)
-            
-            # Prepare result
-            result = {
-                "risk_score": float(risk_score),
-                "confidence_interval": confidence_interval,
-                "risk_level": risk_level,
-                "model_version": "ensemble_v1.0.0",
-                "model_details": model_details,
-                "prediction_timestamp": datetime.utcnow().isoformat()
-            }
+            model_details, predictions = self._predict_ensemble(condition, models, features)
+            risk_score, result = self._build_risk_result(model_details, predictions[:, 0])
             
             # Add explanation if requested
             if include_explanation:
@@ -193,6 +268,214 @@ class DetectionService:
             logger.error(f"Multi-condition prediction failed: {str(e)}", exc_info=True)
             raise
     
+    async def detect_risks(self, patient_data: Dict[str, Any], conditions: List[str],
+                           include_explanations: bool = True,
+                           confidence_threshold: float = 0.5) -> Dict[str, Any]:
+        """
+        Assess risk for one patient across several conditions.
+        
+        The prediction goes through the batch scheduler, so concurrent requests
+        share model calls; explanations are generated per patient afterwards.
+        
+        Args:
+            patient_data: Patient data with optional extracted lab values
+            conditions: Condition names to assess
+            include_explanations: Whether to include SHAP explanations
+            confidence_threshold: Risk score at which a condition is flagged
+            
+        Returns:
+            Dictionary with per-condition predictions and an overall confidence
+        """
+        try:
+            condition_enums = tuple(ConditionEnum(condition) for condition in conditions)
+            features = self._flatten_patient_data(patient_data)
+            
+            predictions = await self.batch_scheduler.submit(features, condition_enums)
+            
+            if include_explanations:
+                for condition, result in predictions.items():
+                    if "error" in result:
+                        continue
+                    models = await self.model_registry.get_condition_models(condition)
+                    expected_features = await self.model_registry.get_expected_features(condition)
+                    feature_frame = pd.DataFrame(
+                        self.model_registry.vectorize(condition, features),
+                        columns=expected_features or None
+                    )
+                    result["explanation"] = await self._generate_explanation(
+                        condition, feature_frame, models, result["risk_score"]
+                    )
+            
+            successful = [result for result in predictions.values() if "error" not in result]
+            overall_confidence = np.mean([
+                1.0 - (result["confidence_interval"]["upper"] - result["confidence_interval"]["lower"])
+                for result in successful
+            ]) if successful else 0.0
+            
+            return {
+                "predictions": {condition.value: result for condition, result in predictions.items()},
+                "flagged_conditions": [
+                    condition.value for condition, result in predictions.items()
+                    if result["risk_score"] >= confidence_threshold
+                ],
+                "overall_confidence": float(overall_confidence),
+                "timestamp": self.get_timestamp()
+            }
+            
+        except Exception as e:
+            logger.error(f"Risk detection failed: {str(e)}", exc_info=True)
+            raise
+    
+    async def detect_risks_batch(self, feature_dicts: List[Dict[str, Any]],
+                                 conditions: Tuple[ConditionEnum, ...]) -> List[Dict[ConditionEnum, Dict[str, Any]]]:
+        """
+        Predict risk for many patients at once, one model call per condition and model.
+        
+        Args:
+            feature_dicts: Flattened patient features, one dict per patient
+            conditions: Conditions to assess for every patient
+            
+        Returns:
+            Per-patient mapping of condition to prediction result, in input order
+        """
+        # Vectorize the patients once per distinct model input layout; conditions
+        # whose models expect the same features share one matrix
+        matrices = {}
+        for condition in conditions:
+            feature_order = self.model_registry.get_feature_order(condition)
+            if feature_order not in matrices:
+                matrices[feature_order] = self.model_registry.prepare_feature_matrix(
+                    feature_dicts, condition
+                )
+        
+        # Conditions have independent models, so their native predict_proba
+        # calls run side by side in worker threads
+        condition_results = await asyncio.gather(*(
+            self._detect_condition_batch(
+                condition, matrices[self.model_registry.get_feature_order(condition)]
+            )
+            for condition in conditions
+        ))
+        results = [{} for _ in feature_dicts]
+        for condition, patient_results in zip(conditions, condition_results):
+            for patient_result, result in zip(results, patient_results):
+                patient_result[condition] = result
+        
+        logger.info(f"Batched risk prediction completed for {len(feature_dicts)} patients")
+        return results
+    
+    async def _detect_condition_batch(self, condition: ConditionEnum,
+                                      X: np.ndarray) -> List[Dict[str, Any]]:
+        """Predict one condition for every row of the feature matrix, in order."""
+        try:
+            models = await self.model_registry.get_condition_models(condition)
+            if not models:
+                raise ValueError(f"No models available for condition: {condition.value}")
+            
+            model_details, predictions = await asyncio.to_thread(
+                self._predict_ensemble, condition, models, X
+            )
+            
+            results = []
+            for row in range(len(X)):
+                _, result = self._build_risk_result(
+                    [dict(detail, prediction=float(predictions[i, row]))
+                     for i, detail in enumerate(model_details)],
+                    predictions[:, row]
+                )
+                result["condition"] = condition
+                results.append(result)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Prediction failed for {condition.value}: {str(e)}")
+            failed_result = {
+                "condition": condition,
+                "risk_score": 0.0,
+                "confidence_interval": {"lower": 0.0, "upper": 0.0},
+                "risk_level": "unknown",
+                "model_version": "unknown",
+                "error": str(e),
+                "prediction_timestamp": datetime.utcnow().isoformat()
+            }
+            return [dict(failed_result) for _ in range(len(X))]
+    
+    def _predict_ensemble(self, condition: ConditionEnum, models: Dict[str, Any],
+                          X: Any) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Score every sample with each model, returning model details and a (models, samples) array."""
+        model_details = []
+        predictions = []
+        
+        # Compiled tree ensembles only pay off on larger batches; single rows
+        # are faster on the native estimator
+        use_compiled = len(X) >= settings.COMPILED_MODEL_MIN_BATCH
+        
+        for model_name, model_info in models.items():
+            try:
+                model = model_info["model"]
+                if use_compiled and model_info.get("compiled_model") is not None:
+                    model = model_info["compiled_model"]
+                calibrator = model_info.get("calibrator")
+                
+                # Get prediction
+                prediction = model.predict_proba(X)[:, 1]  # Probability of positive class
+                
+                # Apply calibration if available
+                if calibrator:
+                    prediction = calibrator.predict_proba(prediction.reshape(-1, 1))[:, 1]
+                
+                predictions.append(prediction)
+                model_details.append({
+                    "model_name": model_name,
+                    "prediction": float(prediction[0]),
+                    "version": model_info.get("version", "1.0.0")
+                })
+                
+            except Exception as e:
+                logger.warning(f"Prediction failed for {model_name}: {str(e)}")
+                continue
+        
+        if not predictions:
+            raise ValueError(f"All models failed for condition: {condition.value}")
+        
+        return model_details, np.vstack(predictions)
+    
+    def _build_risk_result(self, model_details: List[Dict[str, Any]],
+                           ensemble_predictions: np.ndarray) -> Tuple[float, Dict[str, Any]]:
+        """Combine one sample's model predictions into a risk result."""
+        # Calculate ensemble prediction (weighted average)
+        ensemble_weights = [0.4, 0.35, 0.25]  # LR, XGBoost, LightGBM weights
+        if len(ensemble_predictions) == 3:
+            risk_score = np.average(ensemble_predictions, weights=ensemble_weights)
+        else:
+            risk_score = np.mean(ensemble_predictions)
+        
+        # Calculate confidence interval
+        confidence_interval = self._calculate_confidence_interval(
+            ensemble_predictions, risk_score
+        )
+        
+        # Determine risk level
+        risk_level = self._determine_risk_level(risk_score)
+        
+        return risk_score, {
+            "risk_score": float(risk_score),
+            "confidence_interval": confidence_interval,
+            "risk_level": risk_level,
+            "model_version": "ensemble_v1.0.0",
+            "model_details": model_details,
+            "prediction_timestamp": datetime.utcnow().isoformat()
+        }
+    
+    def _flatten_patient_data(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge extracted lab values into the patient's top-level features."""
+        features = dict(patient_data)
+        lab_values = features.pop("lab_values", None) or {}
+        if isinstance(lab_values, dict):
+            for name, value in lab_values.items():
+                features[name] = value.get("value") if isinstance(value, dict) else value
+        return features
+    
     async def _generate_explanation(self, condition: ConditionEnum, features: pd.DataFrame,
                                   models: Dict[str, Any], risk_score: float) -> Dict[str, Any]:
         """Generate SHAP explanation for the prediction."""
@@ -200,15 +483,13 @@ class DetectionService:
             logger.info(f"Generating explanation for {condition.value}")
             
             # Use the primary model (usually XGBoost) for explanation
-            primary_model_name = "xgboost"
-            if primary_model_name not in models:
-                primary_model_name = list(models.keys())[0]
-            
+            primary_model_name = self._get_primary_model_name(models)
             primary_model = models[primary_model_name]["model"]
             
-            # Generate SHAP explanation
+            # Generate SHAP explanation (memoized per model and feature values)
             shap_explanation = await self.explainer.explain_prediction(
-                primary_model, features, condition
+                primary_model, features, condition,
+                model_version=models[primary_model_name].get("version")
             )
             
             # Get top features
@@ -239,6 +520,20 @@ class DetectionService:
                 "error": str(e)
             }
     
+    def _get_primary_model_name(self, models: Dict[str, Any]) -> str:
+        """Pick the model used for explanations: XGBoost if present, else the first."""
+        return "xgboost" if "xgboost" in models else next(iter(models))
+    
+    async def warm_up_explainers(self):
+        """Build each condition's SHAP explainer up front instead of on the first request."""
+        for condition in ConditionEnum:
+            try:
+                models = await self.model_registry.get_condition_models(condition)
+                primary_model = models[self._get_primary_model_name(models)]["model"]
+                await self.explainer.prepare_explainer(primary_model, condition)
+            except Exception as e:
+                logger.warning(f"Explainer warm-up failed for {condition.value}: {str(e)}")
+    
     def _calculate_confidence_interval(self, predictions: List[float], 
                                      ensemble_score: float) -> Dict[str, float]:
         """Calculate 95% confidence interval for ensemble prediction."""
@@ -365,6 +660,10 @@ class DetectionService:
             logger.error(f"Feature validation failed: {str(e)}")
             return {"valid": False, "error": str(e)}
 
-async def get_detection_service() -> DetectionService:
-    """Get the detection service instance."""
-    return DetectionService()
\ No newline at end of file
+    async def close(self):
+        """Stop batching and fail any requests still waiting."""
+        await self.batch_scheduler.close()
+
+def get_detection_service(request: Request) -> DetectionService:
+    """Dependency to get detection service."""
+    return request.app.state.detection_service
\ No newline at end of file
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import asyncio
+from fastapi import Request
 
 from app.extract.pdf_parser import PDFParser
 from app.extract.ocr_engine import OCREngine
@@ -327,6 +328,13 @@ class ExtractionService:
         """Get list of supported file types for extraction."""
         return ["pdf", "jpg", "jpeg", "png"]
     
+    async def close(self) -> None:
+        """Release the worker pools held by the extraction components."""
+        await asyncio.gather(
+            asyncio.to_thread(self.pdf_parser.close),
+            asyncio.to_thread(self.ocr_engine.close)
+        )
+    
     def get_extraction_statistics(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate statistics about extraction results."""
         if not results:
@@ -348,5 +356,6 @@ class ExtractionService:
             "extraction_methods": list(set(r.get("method", "unknown") for r in results))
         }
 
-async def get_extraction_service() -> ExtractionService:
-    return ExtractionService()
\ No newline at end of file
+def get_extraction_service(request: Request) -> ExtractionService:
+    """Dependency to get extraction service."""
+    return request.app.state.extraction_service
\ No newline at end of file
@@ -26,7 +26,7 @@ TEST_CONFIG = {
 
 # Set test environment variables
 for key, value in TEST_CONFIG.items():
-    os.environ[key] = value
+    os.environ[key] = str(value)
 
 # Create test directories
 test_dirs = [
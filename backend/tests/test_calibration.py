@@ -0,0 +1,51 @@
+"""
+Tests for probability calibration.
+"""
+
+import numpy as np
+import pytest
+
+from app.ml.calibration import IsotonicCalibrator
+
+
+class TestIsotonicCalibrator:
+    """Test the isotonic mapping applied to model probabilities."""
+
+    @pytest.fixture
+    def fitted(self):
+        """Fit a calibrator on probabilities that overstate the true rate."""
+        rng = np.random.default_rng(0)
+        probabilities = rng.random(2000)
+        labels = (rng.random(2000) < probabilities * 0.5).astype(int)
+        return IsotonicCalibrator().fit(probabilities, labels)
+
+    def test_fit_returns_self(self):
+        """fit returns the calibrator for chaining."""
+        calibrator = IsotonicCalibrator()
+        assert calibrator.fit(np.array([0.1, 0.9]), np.array([0, 1])) is calibrator
+
+    def test_predict_proba_shape(self, fitted):
+        """Output has a negative and a positive class column summing to one."""
+        calibrated = fitted.predict_proba(np.linspace(0, 1, 11).reshape(-1, 1))
+
+        assert calibrated.shape == (11, 2)
+        np.testing.assert_allclose(calibrated.sum(axis=1), 1.0)
+
+    def test_mapping_is_monotonic(self, fitted):
+        """Higher model probabilities never map to lower calibrated ones."""
+        positive = fitted.predict_proba(np.linspace(0, 1, 101))[:, 1]
+
+        assert np.all(np.diff(positive) >= 0)
+
+    def test_mapping_corrects_overconfidence(self, fitted):
+        """Calibrated probabilities track the observed positive rate."""
+        positive = fitted.predict_proba(np.array([0.8]))[0, 1]
+
+        assert positive == pytest.approx(0.4, abs=0.1)
+
+    def test_out_of_range_inputs_are_clipped(self, fitted):
+        """Inputs outside the fitted range map to the boundary values."""
+        inside = fitted.predict_proba(np.array([0.0, 1.0]))[:, 1]
+        outside = fitted.predict_proba(np.array([-1.0, 2.0]))[:, 1]
+
+        np.testing.assert_allclose(outside, inside)
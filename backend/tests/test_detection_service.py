@@ -0,0 +1,165 @@
+"""
+Tests for micro-batching in the detection service.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.schemas import ConditionEnum
+from app.services.detection_service import BatchScheduler
+
+DIABETES = (ConditionEnum.DIABETES,)
+ALL_CONDITIONS = tuple(ConditionEnum)
+
+
+class FakeDetector:
+    """detect_batch stand-in recording every call it receives."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.calls = []
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self, feature_dicts, conditions):
+        self.calls.append(([features["id"] for features in feature_dicts], conditions))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [{condition: {"id": features["id"]} for condition in conditions}
+                for features in feature_dicts]
+
+
+class TestBatchScheduler:
+    """Test batching, grouping and shutdown of queued detection calls."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_a_batch(self):
+        """Calls inside the wait window are scored together, in order."""
+        detector = FakeDetector()
+        scheduler = BatchScheduler(detector, max_wait_ms=50)
+
+        results = await asyncio.gather(*(
+            scheduler.submit({"id": i}, DIABETES) for i in range(5)
+        ))
+        await scheduler.close()
+
+        assert detector.calls == [([0, 1, 2, 3, 4], DIABETES)]
+        assert [result[ConditionEnum.DIABETES]["id"] for result in results] == list(range(5))
+
+    @pytest.mark.asyncio
+    async def test_groups_by_condition_set(self):
+        """Each distinct condition set gets its own detect_batch call."""
+        detector = FakeDetector()
+        scheduler = BatchScheduler(detector, max_wait_ms=50)
+
+        results = await asyncio.gather(
+            scheduler.submit({"id": 0}, DIABETES),
+            scheduler.submit({"id": 1}, ALL_CONDITIONS),
+            scheduler.submit({"id": 2}, DIABETES)
+        )
+        await scheduler.close()
+
+        assert detector.calls == [([0, 2], DIABETES), ([1], ALL_CONDITIONS)]
+        assert set(results[1]) == set(ALL_CONDITIONS)
+        assert results[2][ConditionEnum.DIABETES]["id"] == 2
+
+    @pytest.mark.asyncio
+    async def test_respects_max_batch_size(self):
+        """Batches never exceed max_batch_size."""
+        detector = FakeDetector()
+        scheduler = BatchScheduler(detector, max_batch_size=2, max_wait_ms=50)
+
+        await asyncio.gather(*(scheduler.submit({"id": i}, DIABETES) for i in range(5)))
+        await scheduler.close()
+
+        assert [ids for ids, _ in detector.calls] == [[0, 1], [2, 3], [4]]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller_in_group(self):
+        """A failing detect_batch call fails each of its callers."""
+        scheduler = BatchScheduler(FakeDetector(error=ValueError("model failed")), max_wait_ms=50)
+
+        results = await asyncio.gather(
+            scheduler.submit({"id": 0}, DIABETES),
+            scheduler.submit({"id": 1}, DIABETES),
+            return_exceptions=True
+        )
+        await scheduler.close()
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_close_fails_in_flight_and_queued_calls(self):
+        """Closing mid-batch fails the batch being scored and calls still queued."""
+        detector = FakeDetector(delay=10)
+        scheduler = BatchScheduler(detector, max_batch_size=1, max_wait_ms=0)
+
+        calls = [asyncio.create_task(scheduler.submit({"id": i}, DIABETES)) for i in range(3)]
+        while not detector.calls:
+            await asyncio.sleep(0)
+        await scheduler.close()
+
+        for call in calls:
+            with pytest.raises(RuntimeError, match="shutting down"):
+                await call
+        assert len(detector.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_close_without_calls(self):
+        """Closing an unused scheduler is a no-op."""
+        scheduler = BatchScheduler(FakeDetector())
+
+        await scheduler.close()
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_results_fail_the_unmatched_callers(self):
+        """Callers left without a result row fail instead of hanging."""
+        async def detect_batch(feature_dicts, conditions):
+            return [{ConditionEnum.DIABETES: {"id": feature_dicts[0]["id"]}}]
+
+        scheduler = BatchScheduler(detect_batch, max_wait_ms=50)
+
+        first, second = await asyncio.wait_for(asyncio.gather(
+            scheduler.submit({"id": 0}, DIABETES),
+            scheduler.submit({"id": 1}, DIABETES),
+            return_exceptions=True
+        ), timeout=5)
+        await scheduler.close()
+
+        assert first[ConditionEnum.DIABETES]["id"] == 0
+        assert isinstance(second, RuntimeError)
+
+    @pytest.mark.asyncio
+    async def test_dispatch_errors_do_not_stop_the_worker(self):
+        """A malformed detect_batch reply fails its batch; later calls still run."""
+        replies = [None]
+
+        async def detect_batch(feature_dicts, conditions):
+            if replies:
+                return replies.pop()
+            return [{ConditionEnum.DIABETES: {"id": features["id"]}} for features in feature_dicts]
+
+        scheduler = BatchScheduler(detect_batch, max_wait_ms=0)
+
+        with pytest.raises(TypeError):
+            await asyncio.wait_for(scheduler.submit({"id": 0}, DIABETES), timeout=5)
+        result = await asyncio.wait_for(scheduler.submit({"id": 1}, DIABETES), timeout=5)
+        await scheduler.close()
+
+        assert result[ConditionEnum.DIABETES]["id"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dead_worker_is_restarted(self):
+        """A worker that has exited is replaced on the next call."""
+        scheduler = BatchScheduler(FakeDetector(), max_wait_ms=0)
+        await scheduler.submit({"id": 0}, DIABETES)
+        scheduler._worker.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await scheduler._worker
+
+        result = await asyncio.wait_for(scheduler.submit({"id": 1}, DIABETES), timeout=5)
+        await scheduler.close()
+
+        assert result[ConditionEnum.DIABETES]["id"] == 1
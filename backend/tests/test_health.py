@@ -0,0 +1,187 @@
+"""
+Tests for the health check subchecks and their aggregation.
+"""
+
+from types import SimpleNamespace
+
+import fakeredis
+import httpx
+import pytest
+
+from app.routers import health
+
+
+class FakeModelRegistry:
+    """Model registry stand-in reporting a fixed load state."""
+
+    def __init__(self, all_loaded=True):
+        self.all_loaded = all_loaded
+
+    async def health_check(self):
+        return {"all_loaded": self.all_loaded}
+
+
+def _request(**state):
+    """Build a request-like object exposing app.state."""
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(**state)))
+
+
+def _http_client(status_code):
+    """Create an HTTP client whose every request returns status_code."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(status_code, json={}))
+    return httpx.AsyncClient(transport=transport)
+
+
+@pytest.fixture(autouse=True)
+def storage_probe_dir(tmp_path, monkeypatch):
+    """Point the storage probe at a directory that does not exist yet."""
+    probe_dir = tmp_path / "probe"
+    monkeypatch.setattr(health, "STORAGE_PROBE_DIR", probe_dir)
+    return probe_dir
+
+
+class TestSubchecks:
+    """Test the individual health subchecks."""
+
+    @pytest.mark.asyncio
+    async def test_redis_healthy(self):
+        """A working Redis passes the read/write round trip."""
+        redis_client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+        result = await health._check_redis(_request(redis_client=redis_client))
+
+        assert result["status"] == "healthy"
+        assert not await redis_client.exists("health_check_test")
+
+    @pytest.mark.asyncio
+    async def test_redis_not_configured(self):
+        """A missing Redis client is reported, not treated as a failure."""
+        result = await health._check_redis(_request())
+
+        assert result["status"] == "not_configured"
+
+    @pytest.mark.asyncio
+    async def test_redis_unhealthy(self):
+        """Connection errors mark Redis unhealthy."""
+        server = fakeredis.FakeServer()
+        server.connected = False
+        redis_client = fakeredis.FakeAsyncRedis(server=server)
+
+        result = await health._check_redis(_request(redis_client=redis_client))
+
+        assert result["status"] == "unhealthy"
+
+    @pytest.mark.asyncio
+    async def test_models(self):
+        """Model status follows the registry's load state."""
+        healthy = await health._check_models(_request(model_registry=FakeModelRegistry(True)))
+        degraded = await health._check_models(_request(model_registry=FakeModelRegistry(False)))
+
+        assert healthy["status"] == "healthy"
+        assert degraded["status"] == "degraded"
+
+    @pytest.mark.asyncio
+    async def test_storage_creates_probe_dir(self, storage_probe_dir):
+        """The storage check creates its directory and leaves no files behind."""
+        result = await health._check_storage()
+
+        assert result["status"] == "healthy"
+        assert storage_probe_dir.is_dir()
+        assert list(storage_probe_dir.iterdir()) == []
+
+    def test_import_has_no_filesystem_side_effect(self, storage_probe_dir):
+        """Nothing is created until a storage check runs."""
+        assert not storage_probe_dir.exists()
+
+    @pytest.mark.asyncio
+    async def test_google_maps(self, monkeypatch):
+        """The Maps key is valid on HTTP 200 and invalid otherwise."""
+        monkeypatch.setattr(health.settings, "GOOGLE_MAPS_API_KEY", "test-key")
+
+        async with _http_client(200) as client:
+            valid = await health._check_google_maps(client)
+        async with _http_client(403) as client:
+            invalid = await health._check_google_maps(client)
+
+        assert valid["status"] == "healthy"
+        assert invalid["status"] == "unhealthy"
+
+    @pytest.mark.asyncio
+    async def test_google_maps_not_configured(self, monkeypatch):
+        """No request is made without a Maps key."""
+        monkeypatch.setattr(health.settings, "GOOGLE_MAPS_API_KEY", "")
+
+        async with _http_client(500) as client:
+            result = await health._check_google_maps(client)
+
+        assert result["status"] == "not_configured"
+
+    @pytest.mark.asyncio
+    async def test_openai(self, monkeypatch):
+        """OpenAI is only checked for configuration."""
+        monkeypatch.setattr(health.settings, "OPENAI_API_KEY", "")
+        assert (await health._check_openai())["status"] == "not_configured"
+
+        monkeypatch.setattr(health.settings, "OPENAI_API_KEY", "test-key")
+        assert (await health._check_openai())["status"] == "configured"
+
+    @pytest.mark.asyncio
+    async def test_external_apis_degraded(self, monkeypatch):
+        """An unhealthy Maps API degrades the external API status."""
+        monkeypatch.setattr(health.settings, "GOOGLE_MAPS_API_KEY", "test-key")
+
+        async with _http_client(403) as client:
+            result = await health._check_external_apis(client)
+
+        assert result["status"] == "degraded"
+        assert set(result["details"]) == {"google_maps", "openai"}
+
+
+class TestHealthCheck:
+    """Test aggregation of the subchecks in the health endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_healthy(self, monkeypatch):
+        """All subchecks passing gives a healthy status."""
+        monkeypatch.setattr(health.settings, "GOOGLE_MAPS_API_KEY", "test-key")
+
+        async with _http_client(200) as client:
+            response = await health.health_check(_request(
+                redis_client=fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer()),
+                model_registry=FakeModelRegistry(True),
+                http_client=client
+            ))
+
+        assert response.status == "healthy"
+        assert set(response.services) == {"api", "redis", "models", "storage", "external_apis"}
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_does_not_degrade(self, monkeypatch):
+        """Redis is optional, so only the other services degrade the API."""
+        monkeypatch.setattr(health.settings, "GOOGLE_MAPS_API_KEY", "")
+        server = fakeredis.FakeServer()
+        server.connected = False
+
+        async with _http_client(200) as client:
+            response = await health.health_check(_request(
+                redis_client=fakeredis.FakeAsyncRedis(server=server),
+                model_registry=FakeModelRegistry(True),
+                http_client=client
+            ))
+
+        assert response.status == "healthy"
+        assert response.services["redis"]["status"] == "unhealthy"
+
+    @pytest.mark.asyncio
+    async def test_failing_subcheck_degrades(self, monkeypatch):
+        """A subcheck that raises is reported unhealthy and degrades the API."""
+        monkeypatch.setattr(health.settings, "GOOGLE_MAPS_API_KEY", "")
+
+        async with _http_client(200) as client:
+            response = await health.health_check(_request(
+                model_registry=None,
+                http_client=client
+            ))
+
+        assert response.status == "degraded"
+        assert response.services["models"]["status"] == "unhealthy"
@@ -0,0 +1,104 @@
+"""
+Tests for OCR result assembly and Tesseract subprocesses in the OCR engine.
+"""
+
+import os
+
+import pytest
+
+from app.extract.ocr_engine import OCREngine
+
+
+def _ocr_data(words):
+    """Build Tesseract word-level data from (text, confidence) pairs."""
+    return {
+        "text": [text for text, _ in words],
+        "conf": [conf for _, conf in words],
+        "left": [10 * i for i in range(len(words))],
+        "top": [5] * len(words),
+        "width": [8] * len(words),
+        "height": [12] * len(words),
+        "block_num": [1] * len(words)
+    }
+
+
+class TestConfidenceCalculation:
+    """Test OCREngine._calculate_confidence."""
+    
+    @pytest.fixture
+    def engine(self):
+        """Create OCR engine without starting its worker pools."""
+        return OCREngine.__new__(OCREngine)
+    
+    def test_low_confidence_regions_are_dicts(self, engine):
+        """Low confidence regions keep the text/confidence/bbox dict shape."""
+        data = _ocr_data([("Glucose", 95), ("l0O", 30), ("mg/dL", 88), (" ", 10)])
+        
+        result = engine._calculate_confidence(data, 0.5)
+        
+        assert result["high_confidence_text"] == "Glucose mg/dL"
+        assert result["low_confidence_regions"] == [{
+            "text": "l0O",
+            "confidence": 0.3,
+            "bbox": {"left": 10, "top": 5, "width": 8, "height": 12}
+        }]
+        assert result["low_confidence_count"] == 1
+        assert result["average_confidence"] == pytest.approx((95 + 30 + 88 + 10) / 400)
+    
+    def test_low_confidence_regions_capped_worst_first(self, engine):
+        """Only the least confident regions are listed, but all are counted."""
+        data = _ocr_data([("a", 40), ("b", 20), ("c", 30), ("d", 45)])
+        
+        result = engine._calculate_confidence(data, 0.5, max_regions=2)
+        
+        assert [region["text"] for region in result["low_confidence_regions"]] == ["b", "c"]
+        assert result["low_confidence_count"] == 4
+    
+    def test_no_valid_confidence(self, engine):
+        """Pages without recognized words report empty results."""
+        result = engine._calculate_confidence(_ocr_data([("", -1)]), 0.5)
+        
+        assert result == {
+            "average_confidence": 0.0,
+            "high_confidence_text": "",
+            "low_confidence_regions": [],
+            "low_confidence_count": 0
+        }
+
+
+class TestTesseractSubprocess:
+    """Test the Tesseract subprocesses used without tesserocr."""
+    
+    @pytest.fixture
+    def engine(self, tmp_path, monkeypatch):
+        """Create OCR engine whose Tesseract command echoes its OpenMP limits."""
+        monkeypatch.setenv("OMP_NUM_THREADS", "8")
+        fake_tesseract = tmp_path / "tesseract"
+        fake_tesseract.write_text('#!/bin/sh\ncat > /dev/null\necho "$OMP_THREAD_LIMIT $OMP_NUM_THREADS $*"\n')
+        fake_tesseract.chmod(0o755)
+        engine = OCREngine.__new__(OCREngine)
+        engine.tesseract_cmd = str(fake_tesseract)
+        engine._lang_arg = "eng"
+        return engine
+    
+    @pytest.mark.asyncio
+    async def test_runs_single_threaded(self, engine):
+        """Subprocesses get OpenMP limited to one thread."""
+        output = await engine._run_tesseract(b"image", "tsv")
+        
+        thread_limit, num_threads, args = output.strip().split(" ", 2)
+        assert (thread_limit, num_threads) == ("1", "1")
+        assert args.startswith("stdin stdout")
+        assert args.endswith("tsv")
+        assert os.environ["OMP_NUM_THREADS"] == "8"
+    
+    @pytest.mark.asyncio
+    async def test_failure_raises(self, engine, tmp_path):
+        """A non-zero exit is reported with Tesseract's error output."""
+        failing = tmp_path / "failing"
+        failing.write_text('#!/bin/sh\necho "bad image" >&2\nexit 1\n')
+        failing.chmod(0o755)
+        engine.tesseract_cmd = str(failing)
+        
+        with pytest.raises(RuntimeError, match="bad image"):
+            await engine._run_tesseract(b"image")
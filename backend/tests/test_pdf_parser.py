@@ -0,0 +1,31 @@
+"""
+Tests for the PDF parser.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.extract.pdf_parser import PDFParser
+
+
+@pytest.fixture
+def pdf_parser():
+    """Create a PDF parser and release its worker pool afterwards."""
+    parser = PDFParser()
+    yield parser
+    parser.close()
+
+
+class TestIsPdfFile:
+    """Test PDF detection by file name."""
+
+    @pytest.mark.parametrize("name", ["report.pdf", "REPORT.PDF", "scan.Pdf", "lab.results.pdf"])
+    def test_pdf_names(self, pdf_parser, name):
+        """Any casing of the .pdf suffix is accepted."""
+        assert pdf_parser.is_pdf_file(Path("uploads") / name)
+
+    @pytest.mark.parametrize("name", [".pdf", ".PDF", "notes.txt", "archive.pdf.zip", "pdf"])
+    def test_non_pdf_names(self, pdf_parser, name):
+        """Hidden files and other suffixes are rejected."""
+        assert not pdf_parser.is_pdf_file(Path("uploads") / name)
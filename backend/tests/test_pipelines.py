@@ -0,0 +1,121 @@
+"""
+Tests for the feature pipeline.
+Single-sample and batched transforms are checked against the original
+pandas implementation of the imputation and feature engineering rules.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.pipelines import FeaturePipeline
+
+VITAL_DEFAULTS = {'age': 45.0, 'bmi': 25.0, 'bp_systolic': 120.0, 'bp_diastolic': 80.0}
+
+
+def _reference(samples):
+    """Impute and engineer features with the original DataFrame rules."""
+    df = pd.DataFrame(samples)
+    for col in df.select_dtypes(include=[np.number]).columns:
+        df[col] = df[col].fillna(VITAL_DEFAULTS.get(col, df[col].median()))
+    for col in df.select_dtypes(exclude=[np.number]).columns:
+        df[col] = df[col].fillna('unknown')
+
+    if 'bmi' in df.columns:
+        df['bmi_category_underweight'] = (df['bmi'] < 18.5).astype(float)
+        df['bmi_category_normal'] = ((df['bmi'] >= 18.5) & (df['bmi'] < 25)).astype(float)
+        df['bmi_category_overweight'] = ((df['bmi'] >= 25) & (df['bmi'] < 30)).astype(float)
+        df['bmi_category_obese'] = (df['bmi'] >= 30).astype(float)
+    if 'bp_systolic' in df.columns and 'bp_diastolic' in df.columns:
+        df['bp_category_normal'] = ((df['bp_systolic'] < 120) & (df['bp_diastolic'] < 80)).astype(float)
+        df['bp_category_elevated'] = ((df['bp_systolic'] >= 120) & (df['bp_systolic'] < 130) & (df['bp_diastolic'] < 80)).astype(float)
+        df['bp_category_stage1'] = (((df['bp_systolic'] >= 130) & (df['bp_systolic'] < 140)) | ((df['bp_diastolic'] >= 80) & (df['bp_diastolic'] < 90))).astype(float)
+        df['bp_category_stage2'] = ((df['bp_systolic'] >= 140) | (df['bp_diastolic'] >= 90)).astype(float)
+    if 'age' in df.columns:
+        df['age_group_young'] = (df['age'] < 30).astype(float)
+        df['age_group_middle'] = ((df['age'] >= 30) & (df['age'] < 60)).astype(float)
+        df['age_group_senior'] = (df['age'] >= 60).astype(float)
+        df['age_squared'] = df['age'] ** 2
+    if 'cholesterol_total' in df.columns and 'cholesterol_hdl' in df.columns:
+        df['cholesterol_ratio'] = df['cholesterol_total'] / (df['cholesterol_hdl'] + 1e-8)
+    if 'glucose_fasting' in df.columns and 'hba1c' in df.columns:
+        df['glucose_hba1c_product'] = df['glucose_fasting'] * df['hba1c']
+    return df
+
+
+@pytest.fixture
+def samples():
+    """Patients covering every category boundary, with missing values."""
+    return [
+        {'age': 29, 'bmi': 18.4, 'bp_systolic': 119, 'bp_diastolic': 79,
+         'cholesterol_total': 180.0, 'cholesterol_hdl': 60.0,
+         'glucose_fasting': 90.0, 'hba1c': 5.2, 'gender': 'female'},
+        {'age': 30, 'bmi': 25.0, 'bp_systolic': 125, 'bp_diastolic': 79,
+         'cholesterol_total': 240.0, 'cholesterol_hdl': 35.0,
+         'glucose_fasting': 130.0, 'hba1c': 7.1, 'gender': 'male'},
+        {'age': 60, 'bmi': 30.0, 'bp_systolic': 135, 'bp_diastolic': 85,
+         'cholesterol_total': 210.0, 'cholesterol_hdl': None,
+         'glucose_fasting': 100.0, 'hba1c': 6.0, 'gender': None},
+        {'age': None, 'bmi': None, 'bp_systolic': 150, 'bp_diastolic': None,
+         'cholesterol_total': 200.0, 'cholesterol_hdl': 50.0,
+         'glucose_fasting': 110.0, 'hba1c': 5.9, 'gender': 'female'},
+    ]
+
+
+class TestFeaturePipeline:
+    """Test single-sample and batched transforms."""
+
+    @pytest.mark.asyncio
+    async def test_transform_matches_reference(self, samples):
+        """Each complete sample transforms to the reference row."""
+        pipeline = FeaturePipeline()
+
+        # A lone None makes an object column in a one-row frame, so missing
+        # values are only compared in the batch test
+        complete = [s for s in samples if None not in s.values()]
+        for sample in complete:
+            expected = _reference([sample]).iloc[0].to_dict()
+            transformed = await pipeline.transform(sample)
+
+            assert transformed.keys() == expected.keys()
+            for name, value in expected.items():
+                if isinstance(value, str):
+                    assert transformed[name] == value
+                else:
+                    assert transformed[name] == pytest.approx(value)
+
+    @pytest.mark.asyncio
+    async def test_transform_imputes_vitals(self):
+        """Missing key vitals get population defaults."""
+        transformed = await FeaturePipeline().transform({'age': None, 'bmi': None})
+
+        assert transformed['age'] == 45.0
+        assert transformed['bmi'] == 25.0
+        assert transformed['age_squared'] == 45.0 ** 2
+        assert transformed['bmi_category_overweight'] == 1.0
+
+    def test_transform_batch_matches_reference(self, samples):
+        """The batch matrix equals the reference numeric columns in order."""
+        X = FeaturePipeline().transform_batch(samples)
+
+        expected = _reference(samples).drop(columns=['gender'])
+        assert X.dtype == np.float32
+        assert X.shape == expected.shape
+        np.testing.assert_allclose(X, expected.to_numpy(dtype=np.float64), rtol=1e-6)
+
+    def test_transform_batch_uses_feature_order(self, samples):
+        """A set feature_order fixes the raw columns."""
+        pipeline = FeaturePipeline()
+        pipeline.feature_order = ['hba1c', 'glucose_fasting']
+
+        X = pipeline.transform_batch(samples)
+
+        expected = _reference([
+            {'hba1c': sample['hba1c'], 'glucose_fasting': sample['glucose_fasting']}
+            for sample in samples
+        ])
+        np.testing.assert_allclose(X, expected.to_numpy(dtype=np.float64), rtol=1e-6)
+
+    def test_transform_batch_is_synchronous(self, samples):
+        """transform_batch returns the matrix directly, not a coroutine."""
+        assert isinstance(FeaturePipeline().transform_batch(samples), np.ndarray)
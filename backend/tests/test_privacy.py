@@ -0,0 +1,210 @@
+"""
+Tests for the Redis session model in the privacy manager.
+Sessions are hashes with a separate file list; Redis is faked in-process.
+"""
+
+import os
+import time
+import uuid
+
+import fakeredis
+import pytest
+
+from app.core.privacy import PrivacyManager
+
+
+@pytest.fixture
+def redis_client():
+    """Create an isolated fake Redis server with Lua support."""
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture
+def privacy_manager(redis_client, tmp_path):
+    """Create a privacy manager storing temp files under tmp_path."""
+    manager = PrivacyManager(redis_client)
+    manager.temp_file_dir = tmp_path
+    return manager
+
+
+def _write_file(directory, name, age_seconds):
+    """Create a temp file whose modification time is age_seconds ago."""
+    path = directory / name
+    path.write_bytes(b"test")
+    modified = time.time() - age_seconds
+    os.utime(path, (modified, modified))
+    return path
+
+
+class TestSessionModel:
+    """Test session create, read, update and cleanup."""
+
+    @pytest.mark.asyncio
+    async def test_create_and_get_session(self, privacy_manager, redis_client):
+        """A new session is a hash with a TTL and decodes to the session dict."""
+        session_id = await privacy_manager.create_session()
+
+        assert await redis_client.type(f"session:{session_id}") == b"hash"
+        assert await redis_client.ttl(f"session:{session_id}") > 0
+
+        session = await privacy_manager.get_session(session_id)
+        assert session["data_processed"] is False
+        assert session["sharing_enabled"] is False
+        assert session["risk_assessments"] == []
+        assert session["files_uploaded"] == []
+        assert isinstance(session["created_at"], str)
+        assert isinstance(session["last_accessed"], str)
+
+    @pytest.mark.asyncio
+    async def test_get_missing_session(self, privacy_manager):
+        """Unknown sessions return None."""
+        assert await privacy_manager.get_session("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_get_session_returns_independent_copies(self, privacy_manager):
+        """Mutating a returned session does not leak into later reads."""
+        session_id = await privacy_manager.create_session()
+
+        first = await privacy_manager.get_session(session_id)
+        first["files_uploaded"].append("file")
+        first["risk_assessments"].append({"condition": "diabetes"})
+
+        second = await privacy_manager.get_session(session_id)
+        assert second["files_uploaded"] == []
+        assert second["risk_assessments"] == []
+
+    @pytest.mark.asyncio
+    async def test_update_session(self, privacy_manager):
+        """Updates are visible on the next read."""
+        session_id = await privacy_manager.create_session()
+        await privacy_manager.get_session(session_id)
+
+        assert await privacy_manager.update_session(session_id, {"sharing_enabled": True})
+
+        session = await privacy_manager.get_session(session_id)
+        assert session["sharing_enabled"] is True
+        assert "created_at" in session
+
+    @pytest.mark.asyncio
+    async def test_update_missing_session(self, privacy_manager, redis_client):
+        """Updating an unknown session fails without creating it."""
+        assert not await privacy_manager.update_session("missing", {"sharing_enabled": True})
+        assert not await redis_client.exists("session:missing")
+
+    @pytest.mark.asyncio
+    async def test_store_patient_data(self, privacy_manager):
+        """Patient data is anonymized and flags the session as processed."""
+        session_id = await privacy_manager.create_session()
+
+        assert await privacy_manager.store_patient_data(session_id, {"age": 47, "name": "Test"})
+
+        patient_data = await privacy_manager.get_patient_data(session_id)
+        assert "name" not in patient_data
+        assert patient_data["age_group"] == "45-54"
+
+        session = await privacy_manager.get_session(session_id)
+        assert session["data_processed"] is True
+        assert session["data_anonymized"] is True
+
+    @pytest.mark.asyncio
+    async def test_store_patient_data_without_session(self, privacy_manager, redis_client):
+        """Patient data is stored, but no session hash is recreated."""
+        assert await privacy_manager.store_patient_data("missing", {"age": 30})
+
+        assert await redis_client.exists("patient_data:missing")
+        assert not await redis_client.exists("session:missing")
+
+    @pytest.mark.asyncio
+    async def test_store_file_metadata(self, privacy_manager, redis_client):
+        """File metadata is stored and listed on its session."""
+        session_id = await privacy_manager.create_session()
+        file_id = str(uuid.uuid4())
+
+        assert await privacy_manager.store_file_metadata(
+            session_id, file_id, {"file_type": "application/pdf", "file_size": 10}
+        )
+
+        metadata = await privacy_manager.get_file_metadata(file_id)
+        assert metadata["file_type"] == "application/pdf"
+        session = await privacy_manager.get_session(session_id)
+        assert session["files_uploaded"] == [file_id]
+        assert await redis_client.ttl(f"session_files:{session_id}") > 0
+
+    @pytest.mark.asyncio
+    async def test_store_file_metadata_without_session(self, privacy_manager, redis_client):
+        """Files for unknown sessions do not leave an orphaned file list."""
+        assert await privacy_manager.store_file_metadata("missing", "file", {})
+
+        assert await redis_client.exists("file:file")
+        assert not await redis_client.exists("session_files:missing")
+
+    @pytest.mark.asyncio
+    async def test_cleanup_session(self, privacy_manager, redis_client, tmp_path):
+        """Cleanup removes every session key and the uploaded files."""
+        session_id = await privacy_manager.create_session()
+        file_id = str(uuid.uuid4())
+        await privacy_manager.store_file_metadata(session_id, file_id, {})
+        await privacy_manager.store_patient_data(session_id, {"age": 30})
+        _write_file(tmp_path, file_id, 0)
+
+        assert await privacy_manager.cleanup_session(session_id)
+
+        assert await privacy_manager.get_session(session_id) is None
+        assert not await redis_client.exists(
+            f"session:{session_id}",
+            f"session_files:{session_id}",
+            f"patient_data:{session_id}",
+            f"file:{file_id}"
+        )
+        assert not (tmp_path / file_id).exists()
+
+
+class TestCleanupJob:
+    """Test the background temp file sweep."""
+
+    @pytest.mark.asyncio
+    async def test_orphan_sweep(self, privacy_manager, redis_client, tmp_path):
+        """Uploads without metadata are removed; other temp files are kept."""
+        live_id = str(uuid.uuid4())
+        orphan_id = str(uuid.uuid4())
+        await redis_client.setex(f"file:{live_id}", 3600, b"{}")
+        _write_file(tmp_path, live_id, 120)
+        _write_file(tmp_path, orphan_id, 120)
+        _write_file(tmp_path, "report.tmp", 120)
+
+        await privacy_manager.run_cleanup_job()
+
+        assert (tmp_path / live_id).exists()
+        assert not (tmp_path / orphan_id).exists()
+        assert (tmp_path / "report.tmp").exists()
+
+    @pytest.mark.asyncio
+    async def test_recent_orphans_are_kept(self, privacy_manager, tmp_path):
+        """Uploads still inside the grace period are not treated as orphans."""
+        upload_id = str(uuid.uuid4())
+        _write_file(tmp_path, upload_id, 0)
+
+        await privacy_manager.run_cleanup_job()
+
+        assert (tmp_path / upload_id).exists()
+
+    @pytest.mark.asyncio
+    async def test_expired_files_are_removed(self, privacy_manager, redis_client, tmp_path):
+        """Files older than the file TTL are removed with their metadata."""
+        file_id = str(uuid.uuid4())
+        await redis_client.set(f"file:{file_id}", b"{}")
+        _write_file(tmp_path, file_id, privacy_manager._file_ttl_s + 60)
+
+        await privacy_manager.run_cleanup_job()
+
+        assert not (tmp_path / file_id).exists()
+        assert not await redis_client.exists(f"file:{file_id}")
+
+    @pytest.mark.asyncio
+    async def test_metadata_without_ttl_is_left_alone(self, privacy_manager, redis_client):
+        """The sweep does not add TTLs to file metadata."""
+        await redis_client.set("file:persistent", b"{}")
+
+        await privacy_manager.run_cleanup_job()
+
+        assert await redis_client.ttl("file:persistent") == -1